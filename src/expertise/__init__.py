@@ -9,7 +9,7 @@ This package provides:
 """
 
 from .engine import ExpertiseEngine
-from .types import Domain, Principle, Rubric, ContrastExample
+from .types import Domain, Principle, Rubric, ContrastExample, SearchRequest
 
 __version__ = "0.1.0"
-__all__ = ["ExpertiseEngine", "Domain", "Principle", "Rubric", "ContrastExample"]
+__all__ = ["ExpertiseEngine", "Domain", "Principle", "Rubric", "ContrastExample", "SearchRequest"]
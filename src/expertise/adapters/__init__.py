@@ -3,11 +3,30 @@ Vector store adapters for domain expertise.
 
 Available adapters:
 - SupabaseAdapter: Uses Supabase with pgvector
+- AsyncSupabaseAdapter: Awaitable Supabase adapter for concurrent retrieval
 - SQLiteAdapter: Local file-based storage with numpy
+- ReplicaAdapter: Local SQLite read replica of a Supabase table, synced incrementally
+- MemoryAdapter: In-memory BM25 keyword search (no database or embeddings)
+
+SQLite and Supabase share an optional EmbeddingCache so unchanged examples are not re-embedded.
 """
 
-from .base import VectorStoreAdapter
+from .base import AsyncVectorStoreAdapter, UpsertError, VectorStoreAdapter
+from .cache import EmbeddingCache
 from .supabase import SupabaseAdapter
+from .supabase_async import AsyncSupabaseAdapter
 from .sqlite import SQLiteAdapter
+from .replica import ReplicaAdapter
+from .memory import MemoryAdapter
 
-__all__ = ["VectorStoreAdapter", "SupabaseAdapter", "SQLiteAdapter"]
+__all__ = [
+    "VectorStoreAdapter",
+    "AsyncVectorStoreAdapter",
+    "UpsertError",
+    "SupabaseAdapter",
+    "AsyncSupabaseAdapter",
+    "SQLiteAdapter",
+    "ReplicaAdapter",
+    "MemoryAdapter",
+    "EmbeddingCache",
+]
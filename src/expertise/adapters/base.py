@@ -2,13 +2,132 @@
 Base adapter interface for vector stores.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any
 
-from ..types import ContrastExample
+from ..embedders import Embedder
+from ..types import ContrastExample, SearchRequest
+from .cache import EmbeddingCache
 
 
-class VectorStoreAdapter(ABC):
+class UpsertError(Exception):
+    """Some examples could not be written, even after retries."""
+
+    def __init__(self, written: int, failures: list[tuple[str, str]]):
+        self.written = written
+        self.failures = failures  # (example id, error message)
+        super().__init__(
+            f"{len(failures)} examples failed to write ({written} written)"
+        )
+
+
+class EmbeddingMixin:
+    """Embedding, caching and text helpers shared by sync and async adapters."""
+
+    embedder: Embedder
+    embedding_cache: EmbeddingCache | None = None
+    query_cache: EmbeddingCache | None = None
+
+    @property
+    def embedding_model(self) -> str:
+        """Name of the embedding model, used in cache keys."""
+        return self.embedder.model
+
+    def get_embedding(self, text: str) -> list[float]:
+        """Get embedding for text from the configured embedder."""
+        return self.embedder.embed_one(text)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize query text so trivially different queries share a cache entry."""
+        return " ".join(query.lower().split())
+
+    def embed_query(self, query: str) -> list[float]:
+        """Get embedding for a search query, consulting the query cache."""
+        text = self.normalize_query(query)
+        if self.query_cache is None:
+            return self.get_embedding(text)
+
+        cached = self.query_cache.get(self.embedding_model, text)
+        if cached is not None:
+            return cached
+
+        embedding = self.get_embedding(text)
+        self.query_cache.put(self.embedding_model, text, embedding)
+        return embedding
+
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Get embeddings for several search queries with one embedder call."""
+        texts = [self.normalize_query(query) for query in queries]
+        if self.query_cache is not None:
+            results = self.query_cache.get_many(self.embedding_model, texts)
+        else:
+            results = [None] * len(texts)
+
+        # Duplicate queries in a batch are embedded once
+        pending = list(dict.fromkeys(
+            text for text, result in zip(texts, results) if result is None
+        ))
+        if pending:
+            embedded = {}
+            for batch in self.embedder.batches(pending):
+                batch_input = [pending[i] for i in batch]
+                embedded.update(zip(batch_input, self.embedder.embed(batch_input)))
+            if self.query_cache is not None:
+                vectors = [embedded[text] for text in pending]
+                self.query_cache.put_many(self.embedding_model, pending, vectors)
+            results = [
+                embedded[text] if result is None else result
+                for text, result in zip(texts, results)
+            ]
+
+        return results
+
+    def embed_text(self, text: str) -> list[float]:
+        """Get embedding for document text, consulting the embedding cache."""
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """
+        Get embeddings for many document texts.
+
+        Cached vectors are reused; the rest are requested in batches sized
+        by the embedder's item and token limits.
+        """
+        if self.embedding_cache is not None:
+            results = self.embedding_cache.get_many(self.embedding_model, texts)
+        else:
+            results = [None] * len(texts)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            pending = [texts[i] for i in missing]
+            for batch in self.embedder.batches(pending):
+                batch_input = [pending[i] for i in batch]
+                embeddings = self.embedder.embed(batch_input)
+                if self.embedding_cache is not None:
+                    self.embedding_cache.put_many(self.embedding_model, batch_input, embeddings)
+                for i, embedding in zip(batch, embeddings):
+                    results[missing[i]] = embedding
+
+        return results
+
+    def example_to_text(self, example: ContrastExample) -> str:
+        """Convert example to text for embedding."""
+        parts = [
+            f"Domain: {example.domain}",
+            f"Category: {example.category}",
+            f"Tags: {', '.join(example.tags)}",
+            f"WEAK: {example.weak_content}",
+            f"STRONG: {example.strong_content}",
+            f"Teaching: {example.teaching_point}",
+            f"Apply when: {example.when_to_apply}",
+        ]
+        return "\n".join(parts)
+
+
+class VectorStoreAdapter(EmbeddingMixin, ABC):
     """Abstract base class for vector store adapters."""
 
     @abstractmethod
@@ -24,6 +143,24 @@ class VectorStoreAdapter(ABC):
         """
         pass
 
+    @abstractmethod
+    def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """
+        Write examples with precomputed embeddings, replacing existing ones.
+
+        Args:
+            examples: List of contrast examples
+            embeddings: One embedding per example, in the same order
+
+        Returns:
+            Number of examples written
+        """
+        pass
+
     @abstractmethod
     def search(
         self,
@@ -31,6 +168,8 @@ class VectorStoreAdapter(ABC):
         domain: str | None = None,
         category: str | None = None,
         limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
     ) -> list[ContrastExample]:
         """
         Search for relevant examples.
@@ -40,12 +179,67 @@ class VectorStoreAdapter(ABC):
             domain: Filter by domain
             category: Filter by category
             limit: Maximum number of results
+            tags: Filter to examples with any of these tags
+            include_embeddings: Set `embedding` on results where the store has one
 
         Returns:
             List of matching examples with similarity scores
         """
         pass
 
+    def search_by_vector(
+        self,
+        vector: list[float],
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """
+        Search with a precomputed query embedding.
+
+        Args:
+            vector: Query embedding from the same model as the index
+            domain: Filter by domain
+            category: Filter by category
+            limit: Maximum number of results
+            tags: Filter to examples with any of these tags
+            include_embeddings: Set `embedding` on results
+
+        Returns:
+            List of matching examples with similarity scores
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support vector search")
+
+    def search_many(self, requests: list[SearchRequest]) -> list[list[ContrastExample]]:
+        """
+        Run several searches, embedding all queries in one batch.
+
+        Adapters without search_by_vector() run each request through
+        search() instead.
+
+        Args:
+            requests: Queries with their own filters and limits
+
+        Returns:
+            One result list per request, in the same order
+        """
+        if type(self).search_by_vector is VectorStoreAdapter.search_by_vector:
+            return [
+                self.search(
+                    request.query, request.domain, request.category, request.limit, request.tags,
+                )
+                for request in requests
+            ]
+        vectors = self.embed_queries([request.query for request in requests])
+        return [
+            self.search_by_vector(
+                vector, request.domain, request.category, request.limit, request.tags,
+            )
+            for request, vector in zip(requests, vectors)
+        ]
+
     @abstractmethod
     def delete_domain(self, domain: str) -> int:
         """
@@ -72,26 +266,83 @@ class VectorStoreAdapter(ABC):
         """
         pass
 
-    def get_embedding(self, text: str) -> list[float]:
-        """Get embedding for text using OpenAI."""
-        import openai
 
-        client = openai.OpenAI()
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text,
+class AsyncVectorStoreAdapter(EmbeddingMixin, ABC):
+    """
+    Awaitable counterpart of VectorStoreAdapter, for asyncio services.
+
+    Methods mirror VectorStoreAdapter; embedders are synchronous, so
+    embedding runs in a worker thread.
+    """
+
+    @abstractmethod
+    async def index(self, examples: list[ContrastExample]) -> int:
+        """Index examples into the vector store."""
+        pass
+
+    @abstractmethod
+    async def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """Write examples with precomputed embeddings, replacing existing ones."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Search for relevant examples."""
+        pass
+
+    @abstractmethod
+    async def search_by_vector(
+        self,
+        vector: list[float],
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Search with a precomputed query embedding."""
+        pass
+
+    async def search_many(self, requests: list[SearchRequest]) -> list[list[ContrastExample]]:
+        """Embed all queries in one batch, then run the searches concurrently."""
+        vectors = await asyncio.to_thread(
+            self.embed_queries, [request.query for request in requests],
         )
-        return response.data[0].embedding
+        return list(await asyncio.gather(*(
+            self.search_by_vector(
+                vector, request.domain, request.category, request.limit, request.tags,
+            )
+            for request, vector in zip(requests, vectors)
+        )))
 
-    def example_to_text(self, example: ContrastExample) -> str:
-        """Convert example to text for embedding."""
-        parts = [
-            f"Domain: {example.domain}",
-            f"Category: {example.category}",
-            f"Tags: {', '.join(example.tags)}",
-            f"WEAK: {example.weak_content}",
-            f"STRONG: {example.strong_content}",
-            f"Teaching: {example.teaching_point}",
-            f"Apply when: {example.when_to_apply}",
-        ]
-        return "\n".join(parts)
+    @abstractmethod
+    async def delete_domain(self, domain: str) -> int:
+        """Delete all examples for a domain."""
+        pass
+
+    @abstractmethod
+    async def count(self, domain: str | None = None) -> int:
+        """Count indexed examples."""
+        pass
+
+    async def close(self):
+        """Release network resources."""
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
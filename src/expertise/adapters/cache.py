@@ -0,0 +1,184 @@
+"""
+Embedding caches for vector store adapters.
+
+Two tiers:
+- LRUCache: bounded in-process cache with optional TTL
+- EmbeddingCache: LRU backed by an on-disk SQLite store, keyed on a
+  content hash of (model, text) so unchanged examples are never re-embedded
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable
+
+import numpy as np
+
+
+class LRUCache:
+    """Size-bounded least-recently-used cache with optional expiry."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a value, marking it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Lookups go to the in-process LRU first, then to the SQLite store at
+    `path` (if given). Vectors are stored on disk as float32 blobs. With
+    `ttl` set, entries older than `ttl` seconds are ignored in both tiers.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = "./cache/embedding_cache.db",
+        maxsize: int = 10000,
+        ttl: float | None = None,
+    ):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._init_db()
+
+    def _init_db(self):
+        """Initialize the on-disk store."""
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Hash (model, text) into a cache key."""
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        """Look up a cached embedding."""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Look up cached embeddings for several texts at once."""
+        keys = [self.make_key(model, text) for text in texts]
+        results: list[list[float] | None] = [self.memory.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing and self.path:
+            found: dict[str, list[float]] = {}
+            sql = "SELECT key, vector FROM embedding_cache WHERE key IN ({})"
+            if self.ttl:
+                sql += f" AND created_at >= datetime('now', '-{int(self.ttl)} seconds')"
+            with sqlite3.connect(self.path) as conn:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    chunk = [keys[i] for i in missing[start:start + 500]]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(sql.format(placeholders), chunk).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype="<f4").tolist()
+
+            for i in missing:
+                vector = found.get(keys[i])
+                if vector is not None:
+                    results[i] = vector
+                    self.memory.put(keys[i], vector)
+                    self.disk_hits += 1
+
+        hits = sum(1 for result in results if result is not None)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put(self, model: str, text: str, embedding: list[float]) -> None:
+        """Store an embedding."""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(
+        self,
+        model: str,
+        texts: list[str],
+        embeddings: list[list[float]],
+    ) -> None:
+        """Store several embeddings in one transaction."""
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            key = self.make_key(model, text)
+            self.memory.put(key, embedding)
+            rows.append((key, model, np.asarray(embedding, dtype="<f4").tobytes()))
+
+        if rows and self.path:
+            with sqlite3.connect(self.path) as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO embedding_cache (key, model, vector)
+                    VALUES (?, ?, ?)
+                """, rows)
+                conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters since this cache was created."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self.memory),
+        }
@@ -0,0 +1,233 @@
+"""
+In-memory keyword search over parsed examples.
+
+Needs no database file, embedding provider or network access: examples
+are held in Python and ranked with BM25 over an inverted index built per
+domain.
+"""
+
+import math
+import re
+import threading
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .base import VectorStoreAdapter
+from ..embedders import Embedder
+from ..types import ContrastExample, SearchRequest
+
+
+# Field weights: tags and teaching points are short, deliberate summaries,
+# so a match there counts for more (BM25F-style weighted term frequency)
+FIELD_WEIGHTS = {
+    "weak_content": 1.0,
+    "strong_content": 1.0,
+    "teaching_point": 2.0,
+    "when_to_apply": 1.0,
+    "tags": 2.0,
+}
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def stem(token: str) -> str:
+    """Strip English plural endings so "headlines" matches "headline"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased, lightly stemmed word tokens."""
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def example_fields(example: ContrastExample) -> dict[str, str]:
+    """Searchable text of an example, keyed like FIELD_WEIGHTS."""
+    return {
+        "weak_content": example.weak_content,
+        "strong_content": example.strong_content,
+        "teaching_point": example.teaching_point,
+        "when_to_apply": example.when_to_apply,
+        "tags": " ".join(example.tags),
+    }
+
+
+@dataclass
+class _BM25Index:
+    """Inverted index over one domain's examples."""
+    examples: list[ContrastExample]
+    postings: dict[str, tuple[np.ndarray, np.ndarray]]  # term -> (doc ids, weighted tf)
+    lengths: np.ndarray  # weighted document lengths
+    categories: np.ndarray  # category per doc, for filtering
+
+    @classmethod
+    def build(cls, examples: list[ContrastExample]) -> "_BM25Index":
+        term_docs: dict[str, dict[int, float]] = {}
+        lengths = np.zeros(len(examples), dtype=np.float32)
+
+        for doc, example in enumerate(examples):
+            for field_name, text in example_fields(example).items():
+                weight = FIELD_WEIGHTS[field_name]
+                tokens = tokenize(text)
+                lengths[doc] += weight * len(tokens)
+                for token in tokens:
+                    docs = term_docs.setdefault(token, {})
+                    docs[doc] = docs.get(doc, 0.0) + weight
+
+        postings = {
+            term: (
+                np.fromiter(docs.keys(), dtype=np.int64, count=len(docs)),
+                np.fromiter(docs.values(), dtype=np.float32, count=len(docs)),
+            )
+            for term, docs in term_docs.items()
+        }
+        return cls(
+            examples=examples,
+            postings=postings,
+            lengths=lengths,
+            categories=np.array([example.category for example in examples], dtype=object),
+        )
+
+    def score(self, terms: list[str], k1: float, b: float) -> np.ndarray:
+        """BM25 score of every document for the query terms."""
+        n = len(self.examples)
+        scores = np.zeros(n, dtype=np.float32)
+        if n == 0:
+            return scores
+
+        average_length = float(self.lengths.mean()) or 1.0
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, tf = posting
+            idf = math.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = k1 * (1.0 - b + b * self.lengths[docs] / average_length)
+            scores[docs] += idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+
+class MemoryAdapter(VectorStoreAdapter):
+    """
+    In-memory BM25 store for small deployments and offline use.
+
+    Examples are kept per domain; each domain's inverted index is rebuilt
+    on the first search after a write. `similarity` on results holds the
+    BM25 score divided by the best score in the example's domain: raw
+    scores depend on each index's own document frequencies and lengths,
+    so only scaled scores can be ranked across domains. Nothing is persisted, so the engine fills this store from
+    the domain's example files when it loads a domain.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        # Kept only so the shared adapter interface is complete; searches
+        # never embed
+        self.embedder = embedder
+        self.k1 = k1
+        self.b = b
+        # domain -> example id -> example
+        self._examples: dict[str, dict[str, ContrastExample]] = {}
+        self._indexes: dict[str, _BM25Index] = {}
+        self._lock = threading.Lock()
+
+    def index(self, examples: list[ContrastExample]) -> int:
+        """Add examples, replacing any with the same domain and id."""
+        with self._lock:
+            for example in examples:
+                self._examples.setdefault(example.domain, {})[example.id] = example
+                self._indexes.pop(example.domain, None)
+        return len(examples)
+
+    def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """Add examples; embeddings are not used by keyword search."""
+        return self.index(examples)
+
+    def search(
+        self,
+        query: str,
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """
+        Rank examples by BM25 over their text fields and tags.
+
+        Examples here have no embeddings, so `include_embeddings` has no effect.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            domains = [domain] if domain else list(self._examples)
+            indexes = [self._get_index(name) for name in domains if name in self._examples]
+
+        candidates: list[tuple[float, int, _BM25Index]] = []
+        for index in indexes:
+            scores = index.score(terms, self.k1, self.b)
+            if category:
+                scores[index.categories != category] = 0.0
+            if tags:
+                wanted = set(tags)
+                mask = np.array([not wanted.intersection(ex.tags) for ex in index.examples])
+                if len(mask):
+                    scores[mask] = 0.0
+
+            matches = np.flatnonzero(scores > 0)
+            if not len(matches):
+                continue
+            scores /= scores[matches].max()
+            best = matches[np.argsort(-scores[matches], kind="stable")[:limit]]
+            candidates.extend((float(scores[doc]), int(doc), index) for doc in best)
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [
+            replace(index.examples[doc], similarity=score)
+            for score, doc, index in candidates[:limit]
+        ]
+
+    def search_many(self, requests: list[SearchRequest]) -> list[list[ContrastExample]]:
+        """Run several keyword searches (nothing to batch-embed)."""
+        return [
+            self.search(
+                request.query, request.domain, request.category, request.limit, request.tags,
+            )
+            for request in requests
+        ]
+
+    def _get_index(self, domain: str) -> _BM25Index:
+        index = self._indexes.get(domain)
+        if index is None:
+            index = _BM25Index.build(list(self._examples[domain].values()))
+            self._indexes[domain] = index
+        return index
+
+    def delete_domain(self, domain: str) -> int:
+        """Forget all examples for a domain."""
+        with self._lock:
+            self._indexes.pop(domain, None)
+            return len(self._examples.pop(domain, {}))
+
+    def count(self, domain: str | None = None) -> int:
+        """Count loaded examples."""
+        with self._lock:
+            if domain:
+                return len(self._examples.get(domain, {}))
+            return sum(len(examples) for examples in self._examples.values())
@@ -0,0 +1,211 @@
+"""
+Compact encodings for stored example payloads.
+
+Payloads default to JSON text. With compression enabled, fields are
+written in a fixed order as varint length-prefixed UTF-8 (no key names),
+then deflated with zlib, optionally against a preset dictionary trained
+on the corpus so even short examples compress well. A one-byte header
+names the codec, so a store can hold any mix of formats and old JSON
+rows stay readable.
+"""
+
+import json
+import struct
+import zlib
+from collections import Counter
+from typing import Any, Callable
+
+from ..types import ContrastExample
+
+
+COMPRESSIONS = ("zlib", "dictionary")
+
+# Payload headers; JSON payloads are stored as TEXT and need none
+CODEC_ZLIB = 1
+CODEC_DICTIONARY = 2  # followed by a little-endian uint32 dictionary id
+DICTIONARY_HEADER = struct.Struct("<BI")
+
+# zlib only looks back 32 KiB, so a larger dictionary is never used
+DICTIONARY_SIZE = 32768
+
+# Field order of the binary layout; list fields hold strings
+FIELDS = (
+    "id",
+    "tags",
+    "weak_content",
+    "weak_reasons",
+    "strong_content",
+    "strong_reasons",
+    "teaching_point",
+    "when_to_apply",
+)
+LIST_FIELDS = frozenset({"tags", "weak_reasons", "strong_reasons"})
+
+
+def payload_fields(example: ContrastExample) -> dict[str, Any]:
+    """Payload fields of an example, keyed as in FIELDS."""
+    return {name: getattr(example, name) for name in FIELDS}
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def pack_fields(fields: dict[str, Any]) -> bytes:
+    """Binary layout of payload fields."""
+    out = bytearray()
+    for name in FIELDS:
+        values = fields[name] if name in LIST_FIELDS else [fields[name]]
+        if name in LIST_FIELDS:
+            _write_varint(out, len(values))
+        for value in values:
+            encoded = value.encode("utf-8")
+            _write_varint(out, len(encoded))
+            out += encoded
+    return bytes(out)
+
+
+def unpack_fields(data: bytes) -> dict[str, Any]:
+    """Inverse of pack_fields()."""
+    fields: dict[str, Any] = {}
+    pos = 0
+    for name in FIELDS:
+        count = 1
+        if name in LIST_FIELDS:
+            count, pos = _read_varint(data, pos)
+        values = []
+        for _ in range(count):
+            length, pos = _read_varint(data, pos)
+            values.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+        fields[name] = values if name in LIST_FIELDS else values[0]
+    return fields
+
+
+def train_dictionary(samples: list[bytes], size: int = DICTIONARY_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from sample payloads.
+
+    Words and word pairs are ranked by the bytes they would save (count
+    times length); the best ones fill the dictionary, placed last so they
+    sit closest to the data in zlib's window.
+    """
+    counts: Counter[bytes] = Counter()
+    for sample in samples:
+        words = sample.split()
+        counts.update(word for word in words if len(word) > 2)
+        counts.update(b" ".join(pair) for pair in zip(words, words[1:]))
+
+    chosen: list[bytes] = []
+    used = 0
+    for phrase, count in sorted(
+        counts.items(), key=lambda item: item[1] * len(item[0]), reverse=True,
+    ):
+        if count < 2:
+            break
+        if used + len(phrase) + 1 > size:
+            continue
+        chosen.append(phrase)
+        used += len(phrase) + 1
+    return b" ".join(reversed(chosen))
+
+
+class PayloadCodec:
+    """
+    Encode example payloads for storage and decode any stored format.
+
+    Usage:
+        codec = PayloadCodec("dictionary", load_dictionary=fetch)
+        codec.set_dictionary(1, train_dictionary(samples))
+        payload = codec.encode(example)
+        fields = codec.decode(payload)
+    """
+
+    def __init__(
+        self,
+        compression: str | None = None,
+        level: int = 6,
+        load_dictionary: Callable[[int], bytes] | None = None,
+    ):
+        """Initialize codec.
+
+        Args:
+            compression: None (JSON text), "zlib", or "dictionary" (zlib
+                with a trained preset dictionary, once one is set).
+            level: zlib compression level.
+            load_dictionary: Fetches a dictionary by id when decoding a
+                payload written with one this codec has not seen.
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown payload compression: {compression}")
+        self.compression = compression
+        self.level = level
+        self.load_dictionary = load_dictionary
+        self.dictionaries: dict[int, bytes] = {}
+        self.dictionary_id: int | None = None  # used for new payloads
+
+    @property
+    def needs_dictionary(self) -> bool:
+        return self.compression == "dictionary" and self.dictionary_id is None
+
+    def set_dictionary(self, dictionary_id: int, dictionary: bytes):
+        """Register a dictionary and encode new payloads with it."""
+        self.dictionaries[dictionary_id] = dictionary
+        self.dictionary_id = dictionary_id
+
+    def encode(self, example: ContrastExample) -> str | bytes:
+        """Payload for storage: JSON text, or header plus compressed fields."""
+        fields = payload_fields(example)
+        if self.compression is None:
+            return json.dumps(fields)
+
+        data = pack_fields(fields)
+        if self.dictionary_id is None:
+            return bytes([CODEC_ZLIB]) + zlib.compress(data, self.level)
+
+        compressor = zlib.compressobj(
+            self.level, zdict=self.dictionaries[self.dictionary_id],
+        )
+        return (
+            DICTIONARY_HEADER.pack(CODEC_DICTIONARY, self.dictionary_id)
+            + compressor.compress(data)
+            + compressor.flush()
+        )
+
+    def decode(self, payload: str | bytes) -> dict[str, Any]:
+        """Fields of a stored payload in any supported format."""
+        if isinstance(payload, str):
+            return json.loads(payload)
+
+        codec = payload[0]
+        if codec == CODEC_ZLIB:
+            return unpack_fields(zlib.decompress(payload[1:]))
+        if codec == CODEC_DICTIONARY:
+            _, dictionary_id = DICTIONARY_HEADER.unpack_from(payload)
+            decompressor = zlib.decompressobj(zdict=self._dictionary(dictionary_id))
+            data = decompressor.decompress(payload[DICTIONARY_HEADER.size:])
+            return unpack_fields(data + decompressor.flush())
+        raise ValueError(f"Unknown payload codec: {codec}")
+
+    def _dictionary(self, dictionary_id: int) -> bytes:
+        dictionary = self.dictionaries.get(dictionary_id)
+        if dictionary is None:
+            if self.load_dictionary is None:
+                raise ValueError(f"Unknown payload dictionary: {dictionary_id}")
+            dictionary = self.load_dictionary(dictionary_id)
+            self.dictionaries[dictionary_id] = dictionary
+        return dictionary
@@ -0,0 +1,287 @@
+"""
+Local read replica of a Supabase example table.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from postgrest.exceptions import APIError
+
+from .base import VectorStoreAdapter
+from .sqlite import SQLiteAdapter
+from .supabase import MISSING_FUNCTION_CODES, SupabaseAdapter, parse_vector, row_to_example
+from ..types import ContrastExample, SearchRequest
+
+
+class ReplicaAdapter(VectorStoreAdapter):
+    """
+    Serve searches from a local SQLite mirror of a Supabase table.
+
+    Supabase stays the source of truth for writes; every search runs
+    against `local`. Rows changed since the last sync are pulled in
+    (updated_at, id) order, `page_size` at a time, starting `sync_overlap`
+    seconds before the last change seen so rows committed late by slow
+    transactions are not missed. Deleted rows are found by comparing
+    per-domain counts and then example ids.
+
+    Reads are stale-while-revalidate: after `refresh_interval` seconds a
+    search starts a background sync and is answered from the replica
+    meanwhile; past `max_staleness` seconds it waits for the sync, so
+    results are never older than that bound. Sync progress is kept in
+    `<local path>.replica.json`, so a restarted process only pulls deltas.
+
+    Usage:
+        replica = ReplicaAdapter(SupabaseAdapter(url, key), SQLiteAdapter(path))
+        examples = replica.search("B2B SaaS headline", domain="copywriting")
+    """
+
+    def __init__(
+        self,
+        source: SupabaseAdapter,
+        local: SQLiteAdapter,
+        refresh_interval: float = 30.0,
+        max_staleness: float = 300.0,
+        page_size: int = 1000,
+        sync_overlap: float = 5.0,
+    ):
+        """Initialize replica.
+
+        Args:
+            source: Supabase table to mirror; receives all writes.
+            local: Local store that serves searches; must use the same
+                embedding model as `source`.
+            refresh_interval: Age in seconds after which a search triggers
+                a background sync.
+            max_staleness: Age in seconds after which a search waits for a
+                sync to finish.
+            page_size: Rows fetched per request while syncing.
+            sync_overlap: Seconds re-read before the last seen change.
+        """
+        if max_staleness < refresh_interval:
+            raise ValueError("max_staleness must be at least refresh_interval")
+        self.source = source
+        self.local = local
+        self.embedder = source.embedder
+        self.embedding_cache = source.embedding_cache
+        self.query_cache = local.query_cache
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.page_size = page_size
+        self.sync_overlap = sync_overlap
+        self.last_error: Exception | None = None
+
+        self._state_path = local.path.with_name(local.path.name + ".replica.json")
+        self._state = self._load_state()
+        self._sync_lock = threading.Lock()
+        self._background: threading.Thread | None = None
+
+    def _load_state(self) -> dict[str, Any]:
+        if self._state_path.exists():
+            return json.loads(self._state_path.read_text())
+        return {"watermark": None, "synced_at": 0.0}
+
+    def _save_state(self):
+        temp_path = self._state_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self._state))
+        temp_path.replace(self._state_path)
+
+    @property
+    def staleness(self) -> float:
+        """Seconds since the replica last finished a sync."""
+        return time.time() - self._state["synced_at"]
+
+    def sync(self) -> int:
+        """
+        Pull changes from the source now.
+
+        Returns:
+            Number of examples written or deleted locally
+        """
+        with self._sync_lock:
+            changed = self._pull_changes() + self._remove_deleted()
+            self._state["synced_at"] = time.time()
+            self._save_state()
+            self.last_error = None
+            return changed
+
+    def _pull_changes(self) -> int:
+        """
+        Copy rows changed since the watermark into the local store.
+
+        Rows in the overlap window that were already applied at the same
+        updated_at are skipped, so a sync with no upstream changes writes
+        nothing and leaves the local partitions and ANN indexes intact.
+        """
+        watermark = self._state["watermark"]
+        # Row id -> updated_at for rows applied within the overlap window
+        seen: dict[str, str] = self._state.get("seen", {})
+        after: tuple[str, str] | None = None
+        if watermark:
+            start = datetime.fromisoformat(watermark) - timedelta(seconds=self.sync_overlap)
+        changed = 0
+
+        while True:
+            query = self.source.client.table(self.source.table).select(
+                "id, domain, category, example_id, content, embedding, updated_at"
+            )
+            if after:
+                updated_at, row_id = after
+                query = query.or_(
+                    f'updated_at.gt."{updated_at}",'
+                    f'and(updated_at.eq."{updated_at}",id.gt.{row_id})'
+                )
+            elif watermark:
+                query = query.gte("updated_at", start.isoformat())
+            response = query.order("updated_at").order("id").limit(self.page_size).execute()
+            rows = response.data or []
+            if not rows:
+                break
+
+            fresh = [row for row in rows if seen.get(row["id"]) != row["updated_at"]]
+            if fresh:
+                self.local.upsert(
+                    [row_to_example(row) for row in fresh],
+                    [parse_vector(row["embedding"]) for row in fresh],
+                )
+                changed += len(fresh)
+            for row in fresh:
+                seen[row["id"]] = row["updated_at"]
+            after = (rows[-1]["updated_at"], rows[-1]["id"])
+            self._state["watermark"] = rows[-1]["updated_at"]
+            if len(rows) < self.page_size:
+                break
+
+        if self._state["watermark"]:
+            cutoff = datetime.fromisoformat(self._state["watermark"]) - timedelta(
+                seconds=self.sync_overlap
+            )
+            seen = {
+                row_id: updated_at for row_id, updated_at in seen.items()
+                if datetime.fromisoformat(updated_at) >= cutoff
+            }
+        self._state["seen"] = seen
+        return changed
+
+    def _remove_deleted(self) -> int:
+        """Drop local examples that no longer exist in the source."""
+        try:
+            source_counts = self.source.domain_counts(exact=True)
+        except APIError as e:
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            # Source without the grouped count RPC (migration 003)
+            return 0
+
+        removed = 0
+        for domain, local_count in self.local.domain_counts().items():
+            source_count = source_counts.get(domain, 0)
+            if source_count == local_count:
+                continue
+            if source_count == 0:
+                removed += self.local.delete_domain(domain)
+                continue
+            stale = self.local.example_ids(domain) - self._source_ids(domain)
+            removed += self.local.delete_examples(domain, sorted(stale))
+        return removed
+
+    def _source_ids(self, domain: str) -> set[str]:
+        ids: set[str] = set()
+        while True:
+            response = self.source.client.table(self.source.table).select(
+                "example_id"
+            ).eq("domain", domain).order("example_id").range(
+                len(ids), len(ids) + self.page_size - 1
+            ).execute()
+            rows = response.data or []
+            ids.update(row["example_id"] for row in rows)
+            if len(rows) < self.page_size:
+                return ids
+
+    def _ensure_fresh(self):
+        """Sync inline past max_staleness, in the background past refresh_interval."""
+        staleness = self.staleness
+        if staleness > self.max_staleness:
+            self.sync()
+        elif staleness > self.refresh_interval:
+            self._sync_in_background()
+
+    def _sync_in_background(self):
+        if self._background is not None and self._background.is_alive():
+            return
+
+        def run():
+            try:
+                self.sync()
+            except Exception as e:
+                # Served reads stay within max_staleness; the next inline
+                # sync raises if the source is still failing
+                self.last_error = e
+
+        self._background = threading.Thread(target=run, name="replica-sync", daemon=True)
+        self._background.start()
+
+    def index(self, examples: list[ContrastExample]) -> int:
+        """Index examples into the source and mirror them locally."""
+        embeddings = self.embed_texts([self.example_to_text(ex) for ex in examples])
+        return self.upsert(examples, embeddings)
+
+    def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """Write to the source, then to the replica so reads see the write at once."""
+        written = self.source.upsert(examples, embeddings)
+        self.local.upsert(examples, embeddings)
+        return written
+
+    def search(
+        self,
+        query: str,
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Search the local replica."""
+        self._ensure_fresh()
+        return self.local.search(query, domain, category, limit, tags, include_embeddings)
+
+    def search_by_vector(
+        self,
+        vector: list[float],
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Search the local replica with a precomputed query embedding."""
+        self._ensure_fresh()
+        return self.local.search_by_vector(
+            vector, domain, category, limit, tags, include_embeddings,
+        )
+
+    def search_many(self, requests: list[SearchRequest]) -> list[list[ContrastExample]]:
+        """Run several searches against the local replica."""
+        self._ensure_fresh()
+        return self.local.search_many(requests)
+
+    def delete_domain(self, domain: str) -> int:
+        """Delete a domain from the source and the replica."""
+        deleted = self.source.delete_domain(domain)
+        self.local.delete_domain(domain)
+        return deleted
+
+    def count(self, domain: str | None = None) -> int:
+        """Count examples in the replica."""
+        self._ensure_fresh()
+        return self.local.count(domain)
+
+    def close(self):
+        """Close the local store's connections."""
+        self.local.close()
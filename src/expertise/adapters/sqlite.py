@@ -5,33 +5,475 @@ Uses SQLite for metadata and numpy for vector operations.
 Fully portable - no external dependencies.
 """
 
+import heapq
 import json
+import os
+import queue
+import random
+import re
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, replace
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import numpy as np
 
 from .base import VectorStoreAdapter
-from ..types import ContrastExample
+from .cache import EmbeddingCache, LRUCache
+from .payload import PayloadCodec, pack_fields, payload_fields, train_dictionary
+from ..ann import ANNIndex, VectorCompressor, create_index
+from ..embedders import Embedder, OpenAIEmbedder
+from ..types import ContrastExample, SearchRequest
+
+
+# Bump when the on-disk layout changes; see _migrate()
+SCHEMA_VERSION = 2
+
+# Embeddings are stored as little-endian float32 blobs
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+SEARCH_MODES = ("vector", "hybrid", "lexical")
+
+# Full-text columns and their BM25 weights; tags and teaching points are
+# short, deliberate summaries, so a match there counts for more
+FTS_COLUMNS = ("weak_content", "strong_content", "teaching_point", "when_to_apply", "tags")
+FTS_WEIGHTS = (1.0, 1.0, 2.0, 1.0, 2.0)
+
+# Below this many rows, scoring partitions serially beats a thread hand-off
+PARALLEL_MIN_ROWS = 16384
+
+# Secondary indexes on domain_examples; bulk_load() drops and rebuilds them
+SECONDARY_INDEXES = {
+    "idx_domain": "domain_examples(domain)",
+    "idx_domain_category": "domain_examples(domain, category)",
+}
+
+# A payload dictionary is trained once a write has this many examples
+# (smaller corpora use plain zlib), from at most PAYLOAD_SAMPLE_ROWS rows
+DICTIONARY_MIN_SAMPLES = 64
+PAYLOAD_SAMPLE_ROWS = 2000
+
+# Bound parameters per `IN (...)` lookup, well under SQLite's limit
+LOOKUP_CHUNK = 500
+
+# Seconds an ANN index may lag its file before a write saves it; flush()
+# and close() save sooner
+ANN_SAVE_INTERVAL = 30.0
+
+# Reciprocal rank fusion constant (Cormack et al.); damps the head of each ranking
+RRF_K = 60
+
+
+def embedding_to_blob(embedding: list[float] | np.ndarray) -> bytes:
+    """Serialize an embedding to a float32 blob."""
+    return np.asarray(embedding, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def blob_to_embedding(blob: bytes) -> np.ndarray:
+    """Deserialize a float32 blob without copying."""
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def row_to_example(domain: str, category: str, content: dict[str, Any]) -> ContrastExample:
+    """Build a ContrastExample from a stored row's decoded payload."""
+    return ContrastExample(
+        id=content["id"],
+        domain=domain,
+        category=category,
+        tags=content.get("tags", []),
+        weak_content=content.get("weak_content", ""),
+        weak_reasons=content.get("weak_reasons", []),
+        strong_content=content.get("strong_content", ""),
+        strong_reasons=content.get("strong_reasons", []),
+        teaching_point=content.get("teaching_point", ""),
+        when_to_apply=content.get("when_to_apply", ""),
+    )
+
+
+def example_fts_values(example: ContrastExample) -> tuple[str, ...]:
+    """Full-text column values for an example, in FTS_COLUMNS order."""
+    return (
+        example.weak_content,
+        example.strong_content,
+        example.teaching_point,
+        example.when_to_apply,
+        " ".join(example.tags),
+    )
+
+
+def fts_query(query: str) -> str | None:
+    """
+    Build an FTS5 MATCH expression from free text.
+
+    Any term may match; the whole query is also added as a phrase so exact
+    matches (e.g. "risk reversal") rank first. Returns None if the query
+    has no searchable terms.
+    """
+    terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+    if not terms:
+        return None
+    expression = [f'"{term}"' for term in terms]
+    if len(terms) > 1:
+        expression.append('"' + " ".join(terms) + '"')
+    return " OR ".join(expression)
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[int]],
+    k: int = RRF_K,
+) -> list[tuple[float, int]]:
+    """Fuse ranked row id lists into (score, row id) pairs, best first."""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row_id in enumerate(ranking, start=1):
+            scores[row_id] = scores.get(row_id, 0.0) + 1.0 / (k + rank)
+    return sorted(((score, row_id) for row_id, score in scores.items()), reverse=True)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def sorted_positions(haystack: np.ndarray, needles: np.ndarray) -> np.ndarray:
+    """Positions in sorted `haystack` of the `needles` it contains."""
+    positions = np.searchsorted(haystack, needles)
+    found = positions < len(haystack)
+    positions, needles = positions[found], needles[found]
+    return positions[haystack[positions] == needles]
+
+
+@dataclass
+class _Sidecar:
+    """Memory-mapped, pre-normalized vectors for one domain."""
+    matrix: np.ndarray  # np.memmap of shape (n, dim)
+    row_ids: np.ndarray
+    category_codes: np.ndarray  # int32 index into categories, per row
+    categories: list[str]
+
+
+@dataclass
+class _Partition:
+    """Pre-normalized vectors for one (domain, category)."""
+    row_ids: np.ndarray  # ascending int64 row ids, aligned with matrix rows
+    matrix: np.ndarray  # (n, dim) float32 rows L2-normalized, or compressed codes
+    compressor: VectorCompressor | None = None
+    scales: np.ndarray | None = None  # per-row int8 scales
+
+    def score(self, query: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """
+        Cosine similarity (approximate when compressed) of every row, or of
+        the given row positions, to a query of shape (dim,), or to m queries
+        of shape (m, dim) as an (n, m) matrix.
+        """
+        matrix, scales = self.matrix, self.scales
+        if rows is not None:
+            matrix = matrix[rows]
+            scales = scales[rows] if scales is not None else None
+        if self.compressor is None:
+            return matrix @ query.T
+        projected = self.compressor.project(query).T
+        return self.compressor.scores(matrix, scales, projected)
+
+    def positions(self, row_ids: np.ndarray) -> np.ndarray:
+        """Matrix positions of the given sorted row ids that are in this partition."""
+        return sorted_positions(self.row_ids, row_ids)
+
+
+class _IndexLock:
+    """
+    Readers-writer lock for one ANN index.
+
+    Searches share it; add/remove (which may reallocate the index's
+    arrays) and parameter changes take it exclusively.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class _Writer:
+    """
+    Single thread owning the write connection.
+
+    Writes are queued and applied one at a time, each in its own
+    transaction, so concurrent indexers in one process never contend for
+    SQLite's write lock.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, args=(connect,), name="sqlite-writer", daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn(conn) in a transaction on the writer thread and return its result."""
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future.result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self, connect: Callable[[], sqlite3.Connection]):
+        conn = connect()
+        try:
+            while (job := self._queue.get()) is not None:
+                fn, future = job
+                try:
+                    with conn:  # commit, or roll back if fn raises
+                        result = fn(conn)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            conn.close()
 
 
 class SQLiteAdapter(VectorStoreAdapter):
     """
     Local file-based vector store using SQLite.
 
-    Stores embeddings as JSON arrays in SQLite.
+    Stores embeddings as float32 blobs in SQLite.
     Uses numpy for cosine similarity calculations.
+
+    Vectors are held in memory as one pre-normalized float32 matrix per
+    (domain, category), loaded on first search. Scoring touches only row
+    ids and vectors; ContrastExample objects are built for the final
+    top-k and kept in a bounded identity cache. The matrices are dropped
+    when this adapter writes, and when another connection or process
+    changes the database (detected via PRAGMA data_version). Searches
+    spanning several partitions (e.g. every domain) score them on a pool
+    of `search_workers` threads and k-way merge the per-partition top-k.
+
+    With `ann` set (e.g. {"type": "hnsw", "M": 16, "ef_search": 64} or
+    {"type": "ivf_flat", "nlist": 256, "nprobe": 16}), searches use a
+    per-domain approximate index persisted next to the database in
+    `<path>.ann/` and updated incrementally on writes; the files are
+    rewritten at most every ANN_SAVE_INTERVAL seconds, by flush() and by
+    close().
+
+    With `mmap=True`, each domain's normalized vectors are written to a
+    raw float32 sidecar in `<path>.vectors/` and opened with np.memmap, so
+    worker processes share pages through the OS page cache. Searches
+    stream over the mapping in `mmap_chunk_rows` blocks with a bounded
+    top-k heap, keeping memory flat for corpora larger than RAM.
+
+    With `compression` set (e.g. {"dtype": "int8", "dimension": 256,
+    "method": "pca", "rescore": 10}), in-memory matrices hold reduced,
+    quantized vectors; the best `limit * rescore` candidates are rescored
+    against the full-precision vectors in SQLite. Quantization saves
+    memory; only a smaller `dimension` also speeds up scoring. Use
+    compression_report() to measure the recall cost on real data.
+
+    An FTS5 table mirrors the text fields and tags of every example.
+    `search_mode` (or the per-call `mode`) picks the ranking: "vector"
+    (cosine), "lexical" (BM25 only, no embedding request) or "hybrid"
+    (both, fused with reciprocal rank fusion). `similarity` on results
+    holds the score that ordered them: cosine, negated BM25 or the fused
+    score respectively.
+
+    With `payload_compression` set to "zlib" or "dictionary" (zlib with a
+    preset dictionary trained on the first large write and stored in the
+    database), example payloads are written in a compact binary layout
+    and compressed; they are only decoded when the final results are
+    hydrated. Existing rows keep their format until compact_payloads()
+    re-encodes them.
+
+    The database runs in WAL mode, so searches never wait for an index
+    run. Each thread reads through its own read-only (query_only)
+    connection; writes from any thread go through one queued writer
+    connection, and `busy_timeout` (seconds) covers writers in other
+    processes. `db_mmap_size` (bytes) and `db_cache_size` (KiB) tune
+    SQLite's own page access for each connection. Call close() to release
+    the connections and writer thread.
     """
 
-    def __init__(self, path: Path | str = "./cache/embeddings.db"):
+    def __init__(
+        self,
+        path: Path | str = "./cache/embeddings.db",
+        embedder: Embedder | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        query_cache: EmbeddingCache | None = None,
+        ann: dict[str, Any] | None = None,
+        mmap: bool = False,
+        mmap_chunk_rows: int = 65536,
+        compression: dict[str, Any] | None = None,
+        example_cache_size: int = 4096,
+        search_mode: str = "vector",
+        search_workers: int | None = None,
+        busy_timeout: float = 30.0,
+        db_mmap_size: int = 256 * 1024 * 1024,
+        db_cache_size: int = 65536,
+        payload_compression: str | None = None,
+    ):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search_mode}")
         self.path = Path(path)
+        self.embedder = embedder or OpenAIEmbedder()
+        self.embedding_cache = embedding_cache
+        self.query_cache = query_cache
         self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Connections: one read-only connection per thread, one writer
+        self.busy_timeout = busy_timeout
+        self.db_mmap_size = db_mmap_size
+        self.db_cache_size = db_cache_size
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writer: _Writer | None = None
+        self._payloads = PayloadCodec(
+            payload_compression, load_dictionary=self._load_payload_dictionary,
+        )
         self._init_db()
 
+        # Set inside bulk_load(); domains written meanwhile need ANN rebuilds
+        self._bulk = False
+        self._bulk_domains: set[str] = set()
+
+        # domain -> category -> partition
+        self._partitions: dict[str, dict[str, _Partition]] = {}
+        self._partitions_lock = threading.RLock()
+        # data_version only changes for commits made by *other* connections,
+        # so it needs a long-lived connection of its own
+        self._watch_conn = self._connect(read_only=True)
+        self._data_version = self._read_data_version()
+
+        # domain -> approximate nearest neighbor index
+        self.ann_config = dict(ann) if ann else None
+        self._ann: dict[str, ANNIndex] = {}
+        self._ann_locks: dict[str, _IndexLock] = {}
+        # domain -> when its in-memory ANN index first diverged from disk
+        self._ann_dirty: dict[str, float] = {}
+        self._ann_dir = self.path.with_name(self.path.name + ".ann")
+
+        # domain -> memory-mapped sidecar
+        self.mmap = mmap
+        self.mmap_chunk_rows = mmap_chunk_rows
+        self._sidecars: dict[str, _Sidecar] = {}
+        self._sidecar_dir = self.path.with_name(self.path.name + ".vectors")
+
+        # Compressed in-memory partitions (float16/int8, optional PCA)
+        self.compression = dict(compression) if compression else None
+
+        # row id -> hydrated example (similarity unset). Upserts update rows
+        # in place, so they evict the ids they replace.
+        self._examples = LRUCache(example_cache_size)
+
+        self.search_mode = search_mode
+
+        # Cross-partition searches score partitions on this pool
+        self.search_workers = search_workers or min(8, os.cpu_count() or 1)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a tuned connection; usable from any thread."""
+        conn = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA mmap_size = {int(self.db_mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.db_cache_size)}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            # Durable at checkpoints; safe from corruption in WAL mode
+            conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read-only connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn(conn) in a transaction on the single writer connection."""
+        with self._connections_lock:
+            if self._writer is None:
+                self._writer = _Writer(self._connect)
+            writer = self._writer
+        return writer.submit(fn)
+
+    def close(self):
+        """Stop the writer thread and close every connection; the adapter is unusable afterwards."""
+        self.flush()
+        with self._connections_lock:
+            writer, self._writer = self._writer, None
+            readers, self._readers = self._readers, []
+        if writer:
+            writer.close()
+        for conn in readers:
+            conn.close()
+        with self._partitions_lock:
+            self._watch_conn.close()
+        self._local = threading.local()
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
     def _init_db(self):
         """Initialize the SQLite database."""
-        with sqlite3.connect(self.path) as conn:
+        # The connection's own context manager only commits; closing() closes it
+        with closing(self._connect()) as conn, conn:
+            # WAL lets readers run alongside a writer; the mode is persistent
+            conn.execute("PRAGMA journal_mode = WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS domain_examples (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -39,61 +481,370 @@ class SQLiteAdapter(VectorStoreAdapter):
                     category TEXT NOT NULL,
                     example_id TEXT NOT NULL,
                     content TEXT NOT NULL,
-                    embedding TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     UNIQUE(domain, example_id)
                 )
             """)
+            self._create_indexes(conn)
+            # One row per (tag, example) so tag filters are index lookups
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_domain
-                ON domain_examples(domain)
+                CREATE TABLE IF NOT EXISTS example_tags (
+                    tag TEXT NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    PRIMARY KEY (tag, row_id)
+                ) WITHOUT ROWID
             """)
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_domain_category
-                ON domain_examples(domain, category)
+                CREATE INDEX IF NOT EXISTS idx_example_tags_row
+                ON example_tags(row_id)
+            """)
+            # Bumped by every write to a domain; part of the signature that
+            # ANN files and mmap sidecars are validated against
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS domain_versions (
+                    domain TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            """)
+            # zlib preset dictionaries referenced by compressed payloads
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS payload_dictionaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dictionary BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
             """)
             conn.commit()
+            self._migrate(conn)
+            for dictionary_id, dictionary in conn.execute(
+                "SELECT id, dictionary FROM payload_dictionaries ORDER BY id"
+            ):
+                self._payloads.dictionaries[dictionary_id] = dictionary
+                if self._payloads.compression == "dictionary":
+                    self._payloads.dictionary_id = dictionary_id
+            self._init_fts(conn)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Upgrade databases written by older versions in place."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        if version < 1:
+            # v0 stored embeddings as JSON text arrays. BLOBs are kept as-is
+            # by the TEXT column affinity, so rows can be rewritten in place.
+            rows = conn.execute(
+                "SELECT id, embedding FROM domain_examples WHERE typeof(embedding) = 'text'"
+            )
+            converted = 0
+            while batch := rows.fetchmany(1000):
+                conn.executemany(
+                    "UPDATE domain_examples SET embedding = ? WHERE id = ?",
+                    [(embedding_to_blob(json.loads(text)), row_id) for row_id, text in batch],
+                )
+                converted += len(batch)
+
+        if version < 2:
+            # v1 kept tags only inside the content JSON
+            conn.execute("""
+                INSERT OR IGNORE INTO example_tags (tag, row_id)
+                SELECT DISTINCT tag.value, de.id
+                FROM domain_examples de, json_each(de.content, '$.tags') tag
+            """)
+
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+        if version < 1 and converted:
+            # Reclaim the space freed by the much smaller blobs. In WAL mode
+            # VACUUM only rewrites pages into the WAL; the checkpoint copies
+            # them back and truncates the database file
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _init_fts(self, conn: sqlite3.Connection):
+        """Create the full-text table, filling it from existing rows if new."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'domain_examples_fts'"
+        ).fetchone()
+        if exists:
+            self.fts = True
+            return
+
+        try:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE domain_examples_fts USING fts5(
+                    {", ".join(FTS_COLUMNS)},
+                    tokenize = 'porter unicode61'
+                )
+            """)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; lexical and hybrid modes are unavailable
+            self.fts = False
+            return
+        self.fts = True
+
+        rows = conn.execute("SELECT id, domain, category, content FROM domain_examples")
+        while batch := rows.fetchmany(1000):
+            conn.executemany(
+                self._fts_insert_sql(),
+                [
+                    (row[0], *example_fts_values(
+                        row_to_example(row[1], row[2], self._payloads.decode(row[3])),
+                    ))
+                    for row in batch
+                ],
+            )
+        conn.commit()
+
+    @staticmethod
+    def _fts_insert_sql() -> str:
+        placeholders = ", ".join("?" * len(FTS_COLUMNS))
+        return (
+            f"INSERT INTO domain_examples_fts (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (?, {placeholders})"
+        )
 
     def index(self, examples: list[ContrastExample]) -> int:
         """Index examples into SQLite."""
-        indexed = 0
-
-        with sqlite3.connect(self.path) as conn:
-            for example in examples:
-                # Generate embedding
-                text = self.example_to_text(example)
-                embedding = self.get_embedding(text)
-
-                # Prepare content as JSON
-                content = json.dumps({
-                    "id": example.id,
-                    "tags": example.tags,
-                    "weak_content": example.weak_content,
-                    "weak_reasons": example.weak_reasons,
-                    "strong_content": example.strong_content,
-                    "strong_reasons": example.strong_reasons,
-                    "teaching_point": example.teaching_point,
-                    "when_to_apply": example.when_to_apply,
-                })
-
-                # Insert or replace
-                conn.execute("""
-                    INSERT OR REPLACE INTO domain_examples
-                    (domain, category, example_id, content, embedding)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    example.domain,
-                    example.category,
-                    example.id,
-                    content,
-                    json.dumps(embedding),
-                ))
-
-                indexed += 1
+        # Generate embeddings in batched requests
+        embeddings = self.embed_texts([self.example_to_text(ex) for ex in examples])
+        return self.upsert(examples, embeddings)
 
-            conn.commit()
+    def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """
+        Write examples with precomputed embeddings into SQLite.
+
+        Payloads and blobs are encoded before the write; the write itself is
+        one transaction of executemany() statements, each prepared once.
+        """
+        # Last write wins for repeated (domain, id) pairs, as row-by-row would
+        latest: dict[tuple[str, str], tuple[ContrastExample, list[float]]] = {}
+        for example, embedding in zip(examples, embeddings):
+            latest[(example.domain, example.id)] = (example, embedding)
+        keys = list(latest)
+        if self._payloads.needs_dictionary and len(latest) >= DICTIONARY_MIN_SAMPLES:
+            sample = random.sample(list(latest.values()), min(len(latest), PAYLOAD_SAMPLE_ROWS))
+            self._train_payload_dictionary([
+                pack_fields(payload_fields(ex)) for ex, _ in sample
+            ])
+        rows = [
+            (ex.domain, ex.category, ex.id, self._payloads.encode(ex), embedding_to_blob(embedding))
+            for ex, embedding in latest.values()
+        ]
+        track_ann = self.ann_config is not None and not self._bulk
+
+        def write(conn: sqlite3.Connection) -> tuple[dict, dict]:
+            # Rows about to be replaced lose their tags and full-text entries
+            replaced = self._row_ids(conn, keys)
+            old_ids = [(row_id,) for row_id in replaced.values()]
+            conn.executemany("DELETE FROM example_tags WHERE row_id = ?", old_ids)
+            if self.fts:
+                conn.executemany("DELETE FROM domain_examples_fts WHERE rowid = ?", old_ids)
+
+            # Update in place so re-indexed examples keep their row ids
+            # (and ANN indexes don't fill up with tombstones)
+            conn.executemany("""
+                INSERT INTO domain_examples
+                (domain, category, example_id, content, embedding)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (domain, example_id) DO UPDATE SET
+                    category = excluded.category,
+                    content = excluded.content,
+                    embedding = excluded.embedding
+            """, rows)
+            self._bump_versions(conn, {domain for domain, _ in keys})
+
+            added = self._row_ids(conn, keys)
+            conn.executemany(
+                "INSERT OR IGNORE INTO example_tags (tag, row_id) VALUES (?, ?)",
+                [
+                    (tag, added[key])
+                    for key, (example, _) in latest.items() for tag in example.tags
+                ],
+            )
+            if self.fts:
+                conn.executemany(
+                    self._fts_insert_sql(),
+                    [
+                        (added[key], *example_fts_values(example))
+                        for key, (example, _) in latest.items()
+                    ],
+                )
+            return replaced, added
+
+        replaced, added = self._write(write)
+        # Replaced rows keep their ids, so their cached examples are stale
+        for row_id in replaced.values():
+            self._examples.discard(row_id)
+
+        if track_ann:
+            # domain -> (replaced row ids, new row ids, new vectors)
+            ann_updates: dict[str, tuple[list[int], list[int], list]] = {}
+            for key, (_, embedding) in latest.items():
+                removed, new_ids, vectors = ann_updates.setdefault(key[0], ([], [], []))
+                if key in replaced:
+                    removed.append(replaced[key])
+                new_ids.append(added[key])
+                vectors.append(embedding)
+            for domain, (removed, new_ids, vectors) in ann_updates.items():
+                self._update_ann(domain, removed, new_ids, vectors)
+        elif self._bulk:
+            self._bulk_domains.update(domain for domain, _ in keys)
 
-        return indexed
+        self._invalidate()
+        return len(rows)
+
+    @staticmethod
+    def _bump_versions(conn: sqlite3.Connection, domains: set[str]):
+        conn.executemany("""
+            INSERT INTO domain_versions (domain, version) VALUES (?, 1)
+            ON CONFLICT (domain) DO UPDATE SET version = version + 1
+        """, [(domain,) for domain in domains])
+
+    def _load_payload_dictionary(self, dictionary_id: int) -> bytes:
+        """Dictionary written by another connection since this adapter opened."""
+        row = self._reader().execute(
+            "SELECT dictionary FROM payload_dictionaries WHERE id = ?",
+            (dictionary_id,),
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown payload dictionary: {dictionary_id}")
+        return row[0]
+
+    def _train_payload_dictionary(self, samples: list[bytes]):
+        """Train, store and start using a new payload dictionary."""
+        dictionary = train_dictionary(samples)
+        dictionary_id = self._write(lambda conn: conn.execute(
+            "INSERT INTO payload_dictionaries (dictionary) VALUES (?)", (dictionary,),
+        ).lastrowid)
+        self._payloads.set_dictionary(dictionary_id, dictionary)
+        # No example rows changed; just don't mistake this write for an external one
+        with self._partitions_lock:
+            self._data_version = self._read_data_version()
+
+    def compact_payloads(self, vacuum: bool = True) -> dict[str, int]:
+        """
+        Re-encode every stored payload with the current payload_compression.
+
+        With "dictionary", a fresh dictionary is trained on a sample of the
+        stored examples first. `vacuum` returns the freed pages to the OS.
+
+        Returns:
+            Dict with rows rewritten and payload bytes before and after
+        """
+        if self._payloads.compression == "dictionary":
+            sample = self._reader().execute(
+                "SELECT content FROM domain_examples ORDER BY random() LIMIT ?",
+                (PAYLOAD_SAMPLE_ROWS,),
+            ).fetchall()
+            if len(sample) >= DICTIONARY_MIN_SAMPLES:
+                self._train_payload_dictionary([
+                    pack_fields(self._payloads.decode(row[0])) for row in sample
+                ])
+
+        report = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+        last_id = 0
+        while rows := self._reader().execute(
+            "SELECT id, content FROM domain_examples WHERE id > ? ORDER BY id LIMIT 1000",
+            (last_id,),
+        ).fetchall():
+            last_id = rows[-1][0]
+            updates = []
+            for row_id, payload in rows:
+                encoded = self._payloads.encode(
+                    row_to_example("", "", self._payloads.decode(payload)),
+                )
+                report["bytes_before"] += len(
+                    payload.encode("utf-8") if isinstance(payload, str) else payload
+                )
+                report["bytes_after"] += len(
+                    encoded.encode("utf-8") if isinstance(encoded, str) else encoded
+                )
+                updates.append((encoded, row_id))
+            self._write(lambda conn: conn.executemany(
+                "UPDATE domain_examples SET content = ? WHERE id = ?", updates,
+            ))
+            report["rows"] += len(updates)
+
+        if vacuum:
+            def vacuum_db(conn: sqlite3.Connection):
+                conn.execute("VACUUM")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            self._write(vacuum_db)
+        # Our own write: reload partitions but keep the ANN indexes
+        self._invalidate()
+        return report
+
+    @staticmethod
+    def _row_ids(
+        conn: sqlite3.Connection,
+        keys: list[tuple[str, str]],
+    ) -> dict[tuple[str, str], int]:
+        """Row ids of existing (domain, example_id) pairs."""
+        by_domain: dict[str, list[str]] = {}
+        for domain, example_id in keys:
+            by_domain.setdefault(domain, []).append(example_id)
+
+        ids: dict[tuple[str, str], int] = {}
+        for domain, example_ids in by_domain.items():
+            for start in range(0, len(example_ids), LOOKUP_CHUNK):
+                chunk = example_ids[start:start + LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                for example_id, row_id in conn.execute(
+                    "SELECT example_id, id FROM domain_examples "
+                    f"WHERE domain = ? AND example_id IN ({placeholders})",
+                    (domain, *chunk),
+                ):
+                    ids[(domain, example_id)] = row_id
+        return ids
+
+    @staticmethod
+    def _create_indexes(conn: sqlite3.Connection):
+        for name, target in SECONDARY_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Load many examples with secondary indexes dropped.
+
+        Inside the block, writes skip maintaining the domain indexes and
+        incremental ANN updates; on exit the indexes are rebuilt in one
+        pass, statistics refreshed and touched ANN indexes rebuilt on the
+        next search. Searches still work meanwhile, but scan the table.
+
+        Usage:
+            with store.bulk_load():
+                pipeline.run(files, domain)
+        """
+        def drop(conn: sqlite3.Connection):
+            for name in SECONDARY_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+        def rebuild(conn: sqlite3.Connection):
+            self._create_indexes(conn)
+            conn.execute("ANALYZE")
+
+        self._write(drop)
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            self._write(rebuild)
+            with self._partitions_lock:
+                for domain in self._bulk_domains:
+                    self._ann.pop(domain, None)
+                    self._ann_dirty.pop(domain, None)
+                self._bulk_domains.clear()
+            self._invalidate()
 
     def search(
         self,
@@ -101,80 +852,912 @@ class SQLiteAdapter(VectorStoreAdapter):
         domain: str | None = None,
         category: str | None = None,
         limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+        mode: str | None = None,
+    ) -> list[ContrastExample]:
+        """Search for similar examples by cosine similarity, BM25 or both."""
+        mode = mode or self.search_mode
+        if mode == "vector":
+            return self.search_by_vector(
+                self.embed_query(query), domain, category, limit, tags, include_embeddings,
+            )
+        if mode == "lexical":
+            return self._hydrate(
+                self._lexical_candidates(query, domain, category, limit, tags),
+                include_embeddings,
+            )
+        if mode == "hybrid":
+            return self._search_hybrid(
+                query, self.embed_query(query), domain, category, limit, tags,
+                include_embeddings,
+            )
+        raise ValueError(f"Unknown search mode: {mode}")
+
+    def search_by_vector(
+        self,
+        vector: list[float],
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
     ) -> list[ContrastExample]:
-        """Search for similar examples using cosine similarity."""
-        # Get query embedding
-        query_embedding = np.array(self.get_embedding(query))
+        """Search with a precomputed query embedding."""
+        query_vector = normalize_rows(np.array([vector], dtype=np.float32))[0]
+        return self._hydrate(
+            self._vector_candidates(query_vector, domain, category, limit, tags),
+            include_embeddings,
+        )
+
+    def search_many(self, requests: list[SearchRequest]) -> list[list[ContrastExample]]:
+        """
+        Run several searches with one embedding batch and one
+        matrix-matrix product per partition.
+        """
+        if not requests:
+            return []
+        if self.search_mode == "lexical":
+            return [
+                self.search(
+                    request.query, request.domain, request.category, request.limit, request.tags,
+                )
+                for request in requests
+            ]
+        if self.search_mode == "hybrid":
+            vectors = self.embed_queries([request.query for request in requests])
+            return [
+                self._search_hybrid(
+                    request.query, vector,
+                    request.domain, request.category, request.limit, request.tags,
+                )
+                for request, vector in zip(requests, vectors)
+            ]
+        if self.ann_config or self.mmap:
+            return super().search_many(requests)
+
+        queries = normalize_rows(np.array(
+            self.embed_queries([request.query for request in requests]),
+            dtype=np.float32,
+        ))
+
+        # Group unfiltered requests by the partitions they touch; tag
+        # filters score only their own rows, so they run one by one
+        partitions: dict[int, _Partition] = {}
+        requests_by_partition: dict[int, list[int]] = {}
+        finished: list[list[tuple[float, int]] | None] = [None] * len(requests)
+        for i, request in enumerate(requests):
+            if request.tags:
+                finished[i] = self._vector_candidates(
+                    queries[i], request.domain, request.category, request.limit, request.tags,
+                )
+                continue
+            for partition in self._select_partitions(request.domain, request.category):
+                partitions[id(partition)] = partition
+                requests_by_partition.setdefault(id(partition), []).append(i)
+
+        def score(key: int) -> list[list[tuple[float, int]]]:
+            partition, indices = partitions[key], requests_by_partition[key]
+            scores = partition.score(queries[indices])  # (rows, len(indices))
+            ranked = []
+            for column, i in enumerate(indices):
+                column_scores = scores[:, column]
+                best = top_k(column_scores, self._shortlist_size(requests[i].limit))
+                ranked.append(list(zip(
+                    column_scores[best].tolist(),
+                    partition.row_ids[best].tolist(),
+                )))
+            return ranked
+
+        keys = list(requests_by_partition)
+        rows = sum(len(partitions[key].row_ids) for key in keys)
+        candidates: list[list[tuple[float, int]]] = [[] for _ in requests]
+        for key, ranked in zip(keys, self._map_partitions(score, keys, rows)):
+            for i, pairs in zip(requests_by_partition[key], ranked):
+                candidates[i].extend(pairs)
+
+        for i, request in enumerate(requests):
+            if finished[i] is None:
+                finished[i] = self._finish(candidates[i], queries[i], request.limit)
+
+        # Fetch every winning row in one query, then share it across results
+        self._fetch_examples([row_id for pairs in finished for _, row_id in pairs])
+        return [self._hydrate(pairs) for pairs in finished]
+
+    def _vector_candidates(
+        self,
+        query_vector: np.ndarray,
+        domain: str | None,
+        category: str | None,
+        limit: int,
+        tags: list[str] | None = None,
+    ) -> list[tuple[float, int]]:
+        """Top (cosine similarity, row id) pairs for a normalized query vector."""
+        allowed = self._tagged_row_ids(domain, category, tags) if tags else None
+        if allowed is not None and len(allowed) == 0:
+            return []
+
+        if self.ann_config:
+            return self._search_ann(query_vector, domain, category, limit, allowed)
+        if self.mmap:
+            return self._search_mmap(query_vector, domain, category, limit, allowed)
+
+        shortlist = self._shortlist_size(limit)
 
-        # Build query
-        sql = "SELECT domain, category, example_id, content, embedding FROM domain_examples"
-        params: list[Any] = []
-        conditions = []
+        # Scatter: score each matching partition with one matrix-vector
+        # product and keep its top-k (in parallel when there's enough work).
+        # Gather: k-way merge of the per-partition rankings.
+        partitions = self._select_partitions(domain, category)
+        ranked = self._map_partitions(
+            lambda partition: self._score_partition(partition, query_vector, shortlist, allowed),
+            partitions,
+            sum(len(partition.row_ids) for partition in partitions),
+        )
+        candidates = list(islice(heapq.merge(*ranked, reverse=True), shortlist))
+        return self._finish(candidates, query_vector, limit)
 
+    @staticmethod
+    def _score_partition(
+        partition: _Partition,
+        query_vector: np.ndarray,
+        shortlist: int,
+        allowed: np.ndarray | None = None,
+    ) -> list[tuple[float, int]]:
+        """Best (similarity, row id) pairs of one partition, best first."""
+        rows = None
+        if allowed is not None:
+            # With a tag filter, only the allowed rows are scored
+            rows = partition.positions(allowed)
+            if len(rows) == 0:
+                return []
+        scores = partition.score(query_vector, rows)
+        best = top_k(scores, shortlist)
+        row_ids = partition.row_ids if rows is None else partition.row_ids[rows]
+        return list(zip(scores[best].tolist(), row_ids[best].tolist()))
+
+    def _map_partitions(self, fn: Callable[[Any], Any], items: list, rows: int) -> list:
+        """
+        Apply `fn` to each partition, on the worker pool when there are
+        several and enough rows to outweigh the hand-off (NumPy releases
+        the GIL during the matrix products).
+        """
+        if self.search_workers <= 1 or len(items) <= 1 or rows < PARALLEL_MIN_ROWS:
+            return [fn(item) for item in items]
+        with self._partitions_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.search_workers,
+                    thread_name_prefix="expertise-search",
+                )
+        return list(self._executor.map(fn, items))
+
+    def _tagged_row_ids(
+        self,
+        domain: str | None,
+        category: str | None,
+        tags: list[str],
+    ) -> np.ndarray:
+        """Sorted row ids having any of `tags`, within the domain/category filter."""
+        placeholders = ",".join("?" * len(tags))
+        sql = f"""
+            SELECT DISTINCT t.row_id
+            FROM example_tags t
+            JOIN domain_examples d ON d.id = t.row_id
+            WHERE t.tag IN ({placeholders})
+        """
+        params: list[Any] = list(tags)
         if domain:
-            conditions.append("domain = ?")
+            sql += " AND d.domain = ?"
             params.append(domain)
         if category:
-            conditions.append("category = ?")
+            sql += " AND d.category = ?"
             params.append(category)
+        sql += " ORDER BY t.row_id"
 
-        if conditions:
-            sql += " WHERE " + " AND ".join(conditions)
+        self._check_data_version()
+        rows = self._reader().execute(sql, params).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
 
-        # Fetch all matching rows (we'll sort by similarity in Python)
-        with sqlite3.connect(self.path) as conn:
-            cursor = conn.execute(sql, params)
-            rows = cursor.fetchall()
+    def _lexical_candidates(
+        self,
+        query: str,
+        domain: str | None,
+        category: str | None,
+        limit: int,
+        tags: list[str] | None = None,
+    ) -> list[tuple[float, int]]:
+        """Top (negated BM25, row id) pairs from the full-text index."""
+        if not self.fts:
+            raise ValueError("Lexical search needs SQLite with FTS5 support")
+        expression = fts_query(query)
+        if expression is None:
+            return []
 
-        # Calculate similarities
-        results = []
-        for row in rows:
-            domain_val, category_val, example_id, content_json, embedding_json = row
-            content = json.loads(content_json)
-            embedding = np.array(json.loads(embedding_json))
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        sql = f"""
+            SELECT -bm25(domain_examples_fts, {weights}) AS score, f.rowid
+            FROM domain_examples_fts f
+            JOIN domain_examples d ON d.id = f.rowid
+            WHERE domain_examples_fts MATCH ?
+        """
+        params: list[Any] = [expression]
+        if domain:
+            sql += " AND d.domain = ?"
+            params.append(domain)
+        if category:
+            sql += " AND d.category = ?"
+            params.append(category)
+        if tags:
+            placeholders = ",".join("?" * len(tags))
+            sql += f" AND d.id IN (SELECT row_id FROM example_tags WHERE tag IN ({placeholders}))"
+            params.extend(tags)
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(limit)
 
-            # Cosine similarity
-            similarity = float(np.dot(query_embedding, embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(embedding)
-            ))
+        return [tuple(row) for row in self._reader().execute(sql, params)]
 
-            example = ContrastExample(
-                id=content["id"],
-                domain=domain_val,
-                category=category_val,
-                tags=content.get("tags", []),
-                weak_content=content.get("weak_content", ""),
-                weak_reasons=content.get("weak_reasons", []),
-                strong_content=content.get("strong_content", ""),
-                strong_reasons=content.get("strong_reasons", []),
-                teaching_point=content.get("teaching_point", ""),
-                when_to_apply=content.get("when_to_apply", ""),
-                similarity=similarity,
+    def _search_hybrid(
+        self,
+        query: str,
+        vector: list[float],
+        domain: str | None,
+        category: str | None,
+        limit: int,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Fuse vector and BM25 rankings with reciprocal rank fusion."""
+        # Rank deeper than `limit` so items strong in one list can surface
+        depth = max(4 * limit, 20)
+        query_vector = normalize_rows(np.array([vector], dtype=np.float32))[0]
+        rankings = [
+            [
+                row_id for _, row_id
+                in self._vector_candidates(query_vector, domain, category, depth, tags)
+            ],
+            [
+                row_id for _, row_id
+                in self._lexical_candidates(query, domain, category, depth, tags)
+            ],
+        ]
+        return self._hydrate(reciprocal_rank_fusion(rankings)[:limit], include_embeddings)
+
+    def _shortlist_size(self, limit: int) -> int:
+        """Candidates kept per partition; compressed scores only shortlist."""
+        rescore = self.compression.get("rescore", 10) if self.compression else 0
+        return limit * rescore if rescore else limit
+
+    def _finish(
+        self,
+        candidates: list[tuple[float, int]],
+        query_vector: np.ndarray,
+        limit: int,
+    ) -> list[tuple[float, int]]:
+        """Merge partition candidates into the final (similarity, row id) top-k."""
+        candidates.sort(reverse=True)
+        candidates = candidates[:self._shortlist_size(limit)]
+        if self.compression and self.compression.get("rescore", 10):
+            candidates = self._rescore(candidates, query_vector)
+        return candidates[:limit]
+
+    def _rescore(
+        self,
+        candidates: list[tuple[float, int]],
+        query_vector: np.ndarray,
+    ) -> list[tuple[float, int]]:
+        """Replace approximate scores with exact ones from stored vectors."""
+        row_ids = [row_id for _, row_id in candidates]
+        placeholders = ",".join("?" * len(row_ids))
+        rows = self._reader().execute(
+            f"SELECT id, embedding FROM domain_examples WHERE id IN ({placeholders})",
+            row_ids,
+        ).fetchall()
+        if not rows:
+            return candidates
+
+        matrix = normalize_rows(np.vstack([blob_to_embedding(row[1]) for row in rows]))
+        exact = dict(zip((row[0] for row in rows), (matrix @ query_vector).tolist()))
+        rescored = [(exact.get(row_id, score), row_id) for score, row_id in candidates]
+        rescored.sort(reverse=True)
+        return rescored
+
+    def _read_data_version(self) -> int:
+        with self._partitions_lock:
+            return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _invalidate(self, external: bool = False):
+        """
+        Drop in-memory partitions so the next search reloads them.
+
+        ANN indexes are maintained incrementally by this adapter's own
+        writes, so they are only dropped for `external` changes.
+        """
+        with self._partitions_lock:
+            self._partitions.clear()
+            self._sidecars.clear()
+            if external:
+                # Other processes may have updated rows in place
+                self._ann.clear()
+                self._ann_dirty.clear()
+                self._examples.clear()
+            self._data_version = self._read_data_version()
+
+    def _check_data_version(self):
+        """Invalidate caches if another connection changed the database."""
+        with self._partitions_lock:
+            if self._read_data_version() != self._data_version:
+                self._invalidate(external=True)
+
+    def _list_domains(self) -> list[str]:
+        return [
+            row[0] for row in self._reader().execute(
+                "SELECT DISTINCT domain FROM domain_examples"
             )
-            results.append(example)
+        ]
+
+    def _select_partitions(
+        self,
+        domain: str | None,
+        category: str | None,
+    ) -> list[_Partition]:
+        """Partitions matching the filters, loading them if needed."""
+        with self._partitions_lock:
+            self._check_data_version()
+            domains = [domain] if domain else self._list_domains()
+
+            selected = []
+            for name in domains:
+                categories = self._partitions.get(name)
+                if categories is None:
+                    categories = self._load_domain(name)
+                    self._partitions[name] = categories
+                if category:
+                    if category in categories:
+                        selected.append(categories[category])
+                else:
+                    selected.extend(categories.values())
+            return selected
+
+    def _load_domain(self, domain: str) -> dict[str, _Partition]:
+        """Read a domain's row ids and vectors into per-category partitions."""
+        rows_by_category: dict[str, list[tuple]] = {}
+        cursor = self._reader().execute(
+            "SELECT id, category, embedding FROM domain_examples WHERE domain = ? ORDER BY id",
+            (domain,),
+        )
+        for row in cursor:
+            rows_by_category.setdefault(row[1], []).append(row)
+
+        matrices = {
+            category_val: normalize_rows(np.vstack([blob_to_embedding(row[2]) for row in rows]))
+            for category_val, rows in rows_by_category.items()
+        }
+
+        # One compressor per domain, fit across all its categories
+        compressor = None
+        if self.compression and matrices:
+            compressor = VectorCompressor.from_config(self.compression)
+            compressor.fit(np.vstack(list(matrices.values())))
+
+        partitions = {}
+        for category_val, rows in rows_by_category.items():
+            matrix, scales = matrices.pop(category_val), None
+            if compressor is not None:
+                matrix, scales = compressor.encode(matrix)
+            partitions[category_val] = _Partition(
+                row_ids=np.array([row[0] for row in rows], dtype=np.int64),
+                matrix=matrix,
+                compressor=compressor,
+                scales=scales,
+            )
+        return partitions
+
+    def compression_report(
+        self,
+        domain: str,
+        compression: dict[str, Any] | None = None,
+        queries: int = 100,
+        k: int = 5,
+        seed: int = 0,
+    ) -> dict[str, Any]:
+        """
+        Measure recall and memory for a compression setting on a domain.
+
+        Queries are synthesized by averaging random pairs of stored vectors.
+        Exact top-k is compared with compressed scoring, both with and
+        without the full-precision rescoring pass.
+
+        Args:
+            domain: Domain to evaluate
+            compression: Setting to test (defaults to this adapter's)
+            queries: Number of sample queries
+            k: Recall cutoff
+            seed: Sampling seed
+
+        Returns:
+            Dict with recall_at_k, recall_at_k_no_rescore, compression_ratio
+            and byte counts
+        """
+        compression = compression or self.compression
+        if not compression:
+            raise ValueError("No compression setting to evaluate")
+
+        rows = self._reader().execute(
+            "SELECT embedding FROM domain_examples WHERE domain = ?",
+            (domain,),
+        ).fetchall()
+        if not rows:
+            raise ValueError(f"No indexed examples for domain: {domain}")
+
+        full = normalize_rows(np.vstack([blob_to_embedding(row[0]) for row in rows]))
+        compressor = VectorCompressor.from_config(compression).fit(full)
+        codes, scales = compressor.encode(full)
+
+        rng = np.random.default_rng(seed)
+        pairs = rng.integers(0, len(full), size=(queries, 2))
+        sample = normalize_rows(full[pairs[:, 0]] + full[pairs[:, 1]])
+
+        k = min(k, len(full))
+        shortlist = min(len(full), k * max(compression.get("rescore", 10), 1))
+        hits = hits_no_rescore = 0
+        for query in sample:
+            exact = set(top_k(full @ query, k).tolist())
+            approx = compressor.scores(codes, scales, compressor.project(query))
+            candidates = top_k(approx, shortlist)
+            rescored = candidates[top_k(full[candidates] @ query, k)]
+            hits += len(exact & set(rescored.tolist()))
+            hits_no_rescore += len(exact & set(candidates[:k].tolist()))
+
+        compressed_bytes = compressor.nbytes(codes, scales)
+        return {
+            "domain": domain,
+            "examples": len(full),
+            "queries": queries,
+            "k": k,
+            "recall_at_k": hits / (queries * k),
+            "recall_at_k_no_rescore": hits_no_rescore / (queries * k),
+            "full_bytes": full.nbytes,
+            "compressed_bytes": compressed_bytes,
+            "compression_ratio": full.nbytes / compressed_bytes,
+        }
+
+    @property
+    def ann_params(self) -> dict[str, Any] | None:
+        """ANN index type and its recall/latency knobs."""
+        return dict(self.ann_config) if self.ann_config else None
+
+    def set_ann_params(self, **params: Any):
+        """
+        Change search-time ANN knobs (`nprobe` for ivf_flat, `ef_search`
+        for hnsw) on loaded and future indexes.
+        """
+        if not self.ann_config:
+            raise ValueError("No ANN index configured")
+        with self._partitions_lock:
+            for domain, index in self._ann.items():
+                with self._ann_lock(domain).exclusive():
+                    index.set_params(**params)
+            self.ann_config.update(params)
+
+    def _ann_lock(self, domain: str) -> _IndexLock:
+        with self._partitions_lock:
+            return self._ann_locks.setdefault(domain, _IndexLock())
+
+    def _ann_path(self, domain: str) -> Path:
+        return self._ann_dir / f"{domain}.{self.ann_config['type']}.npz"
 
-        # Sort by similarity descending and limit
-        results.sort(key=lambda x: x.similarity or 0, reverse=True)
-        return results[:limit]
+    def _domain_signature(self, domain: str) -> dict[str, int]:
+        """Row count, max row id and write version; changes whenever the domain's rows change."""
+        count, max_id, version = self._reader().execute(
+            """
+            SELECT COUNT(*), COALESCE(MAX(id), 0),
+                (SELECT COALESCE(MAX(version), 0) FROM domain_versions WHERE domain = ?)
+            FROM domain_examples WHERE domain = ?
+            """,
+            (domain, domain),
+        ).fetchone()
+        return {"count": count, "max_id": max_id, "version": version}
+
+    def _get_ann(self, domain: str) -> ANNIndex:
+        """Load the domain's ANN index, rebuilding it if missing or stale."""
+        with self._partitions_lock:
+            index = self._ann.get(domain)
+            if index is not None:
+                return index
+
+            path = self._ann_path(domain)
+            signature = self._domain_signature(domain)
+            if path.exists() and ANNIndex.read_header(path)["metadata"] == signature:
+                index = ANNIndex.load(path)
+                search_params = {
+                    name: value for name, value in self.ann_config.items()
+                    if name != "type" and name in index.params
+                }
+                index.set_params(**search_params)
+            else:
+                index = self._build_ann(domain)
+                index.save(path, metadata=signature)
+
+            self._ann[domain] = index
+            return index
+
+    def _build_ann(self, domain: str) -> ANNIndex:
+        """Build a fresh ANN index from every row in the domain."""
+        params = {name: value for name, value in self.ann_config.items() if name != "type"}
+        index = create_index(self.ann_config["type"], **params)
+        rows = self._reader().execute(
+            "SELECT id, embedding FROM domain_examples WHERE domain = ?",
+            (domain,),
+        ).fetchall()
+        if rows:
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            vectors = normalize_rows(np.vstack([blob_to_embedding(row[1]) for row in rows]))
+            index.add(ids, vectors)
+        return index
+
+    def _update_ann(
+        self,
+        domain: str,
+        removed: list[int],
+        added: list[int],
+        vectors: list[list[float]],
+    ):
+        """
+        Apply a write to the domain's ANN index.
+
+        The index file is rewritten at most every ANN_SAVE_INTERVAL
+        seconds (and by flush()), not on every write, so a load of many
+        batches doesn't rewrite it once per batch.
+        """
+        index = self._get_ann(domain)
+        matrix = normalize_rows(np.array(vectors, dtype=np.float32))
+        with self._ann_lock(domain).exclusive():
+            index.remove(np.array(removed, dtype=np.int64))
+            index.add(np.array(added, dtype=np.int64), matrix)
+        with self._partitions_lock:
+            self._ann_dirty.setdefault(domain, time.monotonic())
+            due = time.monotonic() - self._ann_dirty[domain] >= ANN_SAVE_INTERVAL
+        if due:
+            self._save_ann(domain)
+
+    def _save_ann(self, domain: str):
+        """Write a changed ANN index to disk, stamped with the current signature."""
+        with self._partitions_lock:
+            index = self._ann.get(domain)
+            if self._ann_dirty.pop(domain, None) is None or index is None:
+                return
+            signature = self._domain_signature(domain)
+        with self._ann_lock(domain).shared():
+            index.save(self._ann_path(domain), metadata=signature)
+
+    def flush(self):
+        """Write ANN indexes changed since they were last saved."""
+        with self._partitions_lock:
+            domains = list(self._ann_dirty)
+        for domain in domains:
+            self._save_ann(domain)
+
+    def _search_ann(
+        self,
+        query_vector: np.ndarray,
+        domain: str | None,
+        category: str | None,
+        limit: int,
+        allowed: np.ndarray | None = None,
+    ) -> list[tuple[float, int]]:
+        """
+        Top (similarity, row id) pairs from per-domain ANN indexes.
+
+        `allowed` (sorted row ids from a tag filter) already reflects the
+        domain and category filters.
+        """
+        # The global lock only covers fetching index references; searches
+        # run concurrently, excluded only by writes to the same index
+        self._check_data_version()
+        domains = [domain] if domain else self._list_domains()
+
+        candidates: list[tuple[float, int]] = []
+        for name in domains:
+            domain_allowed = allowed
+            if category and allowed is None:
+                domain_allowed = np.array([
+                    row[0] for row in self._reader().execute(
+                        "SELECT id FROM domain_examples WHERE domain = ? AND category = ?",
+                        (name, category),
+                    )
+                ], dtype=np.int64)
+                if len(domain_allowed) == 0:
+                    continue
+            index = self._get_ann(name)
+            with self._ann_lock(name).shared():
+                ids, scores = index.search(query_vector, limit, domain_allowed)
+            candidates.extend(zip(scores.tolist(), ids.tolist()))
+
+        candidates.sort(reverse=True)
+        return candidates[:limit]
+
+    def _fetch_examples(self, row_ids: list[int]) -> dict[int, ContrastExample]:
+        """Examples for row ids, from the identity cache or a single query."""
+        by_id: dict[int, ContrastExample] = {}
+        missing = []
+        for row_id in row_ids:
+            example = self._examples.get(row_id)
+            if example is None:
+                missing.append(row_id)
+            else:
+                by_id[row_id] = example
+
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            rows = self._reader().execute(
+                f"SELECT id, domain, category, content FROM domain_examples WHERE id IN ({placeholders})",
+                missing,
+            ).fetchall()
+            for row in rows:
+                example = row_to_example(row[1], row[2], self._payloads.decode(row[3]))
+                self._examples.put(row[0], example)
+                by_id[row[0]] = example
+
+        return by_id
+
+    def _hydrate(
+        self,
+        candidates: list[tuple[float, int]],
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Build examples for (similarity, row id) pairs, preserving order."""
+        row_ids = [row_id for _, row_id in candidates]
+        by_id = self._fetch_examples(row_ids)
+
+        embeddings: dict[int, list[float]] = {}
+        if include_embeddings and row_ids:
+            placeholders = ",".join("?" * len(row_ids))
+            rows = self._reader().execute(
+                f"SELECT id, embedding FROM domain_examples WHERE id IN ({placeholders})",
+                row_ids,
+            ).fetchall()
+            embeddings = {row[0]: blob_to_embedding(row[1]).tolist() for row in rows}
+
+        return [
+            replace(by_id[row_id], similarity=similarity, embedding=embeddings.get(row_id))
+            for similarity, row_id in candidates
+            if row_id in by_id
+        ]
+
+    def _get_sidecar(self, domain: str) -> _Sidecar | None:
+        """Open the domain's vector sidecar, writing it first if missing."""
+        with self._partitions_lock:
+            sidecar = self._sidecars.get(domain)
+            if sidecar is not None:
+                return sidecar
+
+            # File names carry the domain signature, so every process agrees
+            # on which sidecar matches the current rows
+            signature = self._domain_signature(domain)
+            if signature["count"] == 0:
+                return None
+            stem = f"{domain}.{signature['count']}-{signature['max_id']}-{signature['version']}"
+            vectors_path = self._sidecar_dir / f"{stem}.f32"
+            meta_path = self._sidecar_dir / f"{stem}.meta.npz"
+            if not (vectors_path.exists() and meta_path.exists()):
+                self._write_sidecar(domain, vectors_path, meta_path)
+
+            with np.load(meta_path, allow_pickle=False) as meta:
+                row_ids = meta["row_ids"]
+                category_codes = meta["category_codes"]
+                categories = meta["categories"].tolist()
+                dimension = int(meta["dimension"][0])
+
+            sidecar = _Sidecar(
+                matrix=np.memmap(
+                    vectors_path, dtype=EMBEDDING_DTYPE, mode="r",
+                    shape=(len(row_ids), dimension),
+                ),
+                row_ids=row_ids,
+                category_codes=category_codes,
+                categories=categories,
+            )
+            self._sidecars[domain] = sidecar
+            return sidecar
+
+    def _write_sidecar(self, domain: str, vectors_path: Path, meta_path: Path):
+        """Stream a domain's vectors from SQLite into a raw float32 file."""
+        self._sidecar_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        tmp_vectors = vectors_path.with_name(vectors_path.name + suffix)
+        tmp_meta = meta_path.with_name(meta_path.name + suffix)
+
+        row_ids: list[int] = []
+        category_codes: list[int] = []
+        categories: dict[str, int] = {}
+        dimension = 0
+
+        with self._partitions_lock, open(tmp_vectors, "wb") as f:
+            cursor = self._reader().execute(
+                "SELECT id, category, embedding FROM domain_examples WHERE domain = ? ORDER BY id",
+                (domain,),
+            )
+            while rows := cursor.fetchmany(self.mmap_chunk_rows):
+                block = normalize_rows(np.vstack([blob_to_embedding(row[2]) for row in rows]))
+                dimension = block.shape[1]
+                f.write(block.astype(EMBEDDING_DTYPE, copy=False).tobytes())
+                for row_id, category_val, _ in rows:
+                    row_ids.append(row_id)
+                    category_codes.append(categories.setdefault(category_val, len(categories)))
+
+        with open(tmp_meta, "wb") as f:
+            np.savez(
+                f,
+                row_ids=np.array(row_ids, dtype=np.int64),
+                category_codes=np.array(category_codes, dtype=np.int32),
+                categories=np.array(list(categories), dtype=str),
+                dimension=np.array([dimension]),
+            )
+
+        # Meta last: a vectors file is only used once its meta exists
+        tmp_vectors.replace(vectors_path)
+        tmp_meta.replace(meta_path)
+
+        # Remove sidecars for older versions of this domain
+        for old in self._sidecar_dir.glob(f"{domain}.*"):
+            if old not in (vectors_path, meta_path) and not old.name.endswith(".tmp"):
+                old.unlink(missing_ok=True)
+
+    def _search_mmap(
+        self,
+        query_vector: np.ndarray,
+        domain: str | None,
+        category: str | None,
+        limit: int,
+        allowed: np.ndarray | None = None,
+    ) -> list[tuple[float, int]]:
+        """
+        Blocked search over memory-mapped sidecars with bounded top-k heaps,
+        one sidecar per worker, merged at the end.
+
+        With `allowed` (sorted row ids from a tag filter), only those rows
+        are read from the mapping.
+        """
+        with self._partitions_lock:
+            self._check_data_version()
+            domains = [domain] if domain else self._list_domains()
+            sidecars = [
+                sidecar for sidecar in (self._get_sidecar(name) for name in domains)
+                if sidecar is not None
+            ]
+
+        rows = sum(len(sidecar.row_ids) for sidecar in sidecars)
+        ranked = self._map_partitions(
+            lambda sidecar: self._scan_sidecar(sidecar, query_vector, category, limit, allowed),
+            sidecars,
+            rows,
+        )
+        return list(islice(heapq.merge(*ranked, reverse=True), limit))
+
+    def _scan_sidecar(
+        self,
+        sidecar: _Sidecar,
+        query_vector: np.ndarray,
+        category: str | None,
+        limit: int,
+        allowed: np.ndarray | None,
+    ) -> list[tuple[float, int]]:
+        """Best (similarity, row id) pairs of one sidecar, best first."""
+        heap: list[tuple[float, int]] = []  # min-heap of the best `limit`
+
+        def push(item: tuple[float, int]):
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heappushpop(heap, item)
+
+        if allowed is not None:
+            rows = sorted_positions(sidecar.row_ids, allowed)
+            if len(rows) == 0:
+                return []
+            scores = sidecar.matrix[rows] @ query_vector
+            for i in top_k(scores, limit):
+                push((float(scores[i]), int(sidecar.row_ids[rows[i]])))
+            return sorted(heap, reverse=True)
+
+        code = None
+        if category:
+            if category not in sidecar.categories:
+                return []
+            code = sidecar.categories.index(category)
+
+        for start in range(0, len(sidecar.row_ids), self.mmap_chunk_rows):
+            end = start + self.mmap_chunk_rows
+            scores = sidecar.matrix[start:end] @ query_vector
+            if code is not None:
+                scores = np.where(sidecar.category_codes[start:end] == code, scores, -np.inf)
+            for i in top_k(scores, limit):
+                if scores[i] == -np.inf:
+                    break
+                push((float(scores[i]), int(sidecar.row_ids[start + i])))
+
+        return sorted(heap, reverse=True)
 
     def delete_domain(self, domain: str) -> int:
         """Delete all examples for a domain."""
-        with sqlite3.connect(self.path) as conn:
+        def write(conn: sqlite3.Connection) -> int:
+            conn.execute(
+                "DELETE FROM example_tags WHERE row_id IN "
+                "(SELECT id FROM domain_examples WHERE domain = ?)",
+                (domain,),
+            )
+            if self.fts:
+                conn.execute(
+                    "DELETE FROM domain_examples_fts WHERE rowid IN "
+                    "(SELECT id FROM domain_examples WHERE domain = ?)",
+                    (domain,),
+                )
             cursor = conn.execute(
                 "DELETE FROM domain_examples WHERE domain = ?",
                 (domain,)
             )
-            conn.commit()
+            self._bump_versions(conn, {domain})
             return cursor.rowcount
 
+        deleted = self._write(write)
+
+        with self._partitions_lock:
+            self._ann.pop(domain, None)
+            self._ann_dirty.pop(domain, None)
+            if self.ann_config:
+                self._ann_path(domain).unlink(missing_ok=True)
+            if self.mmap:
+                for sidecar_file in self._sidecar_dir.glob(f"{domain}.*"):
+                    sidecar_file.unlink(missing_ok=True)
+        self._invalidate()
+        return deleted
+
+    def delete_examples(self, domain: str, example_ids: list[str]) -> int:
+        """Delete the given examples from a domain."""
+        keys = [(domain, example_id) for example_id in example_ids]
+
+        def write(conn: sqlite3.Connection) -> int:
+            row_ids = [(row_id,) for row_id in self._row_ids(conn, keys).values()]
+            conn.executemany("DELETE FROM example_tags WHERE row_id = ?", row_ids)
+            if self.fts:
+                conn.executemany("DELETE FROM domain_examples_fts WHERE rowid = ?", row_ids)
+            conn.executemany("DELETE FROM domain_examples WHERE id = ?", row_ids)
+            self._bump_versions(conn, {domain})
+            return len(row_ids)
+
+        deleted = self._write(write)
+        if deleted:
+            # Rare enough that rebuilding the domain's ANN index beats patching it
+            with self._partitions_lock:
+                self._ann.pop(domain, None)
+                self._ann_dirty.pop(domain, None)
+                if self.ann_config:
+                    self._ann_path(domain).unlink(missing_ok=True)
+            self._invalidate()
+        return deleted
+
+    def example_ids(self, domain: str) -> set[str]:
+        """Ids of every example stored for a domain."""
+        return {
+            row[0] for row in self._reader().execute(
+                "SELECT example_id FROM domain_examples WHERE domain = ?", (domain,),
+            )
+        }
+
+    def domain_counts(self) -> dict[str, int]:
+        """Example count per domain."""
+        return dict(self._reader().execute(
+            "SELECT domain, COUNT(*) FROM domain_examples GROUP BY domain"
+        ).fetchall())
+
     def count(self, domain: str | None = None) -> int:
         """Count indexed examples."""
-        with sqlite3.connect(self.path) as conn:
-            if domain:
-                cursor = conn.execute(
-                    "SELECT COUNT(*) FROM domain_examples WHERE domain = ?",
-                    (domain,)
-                )
-            else:
-                cursor = conn.execute("SELECT COUNT(*) FROM domain_examples")
-            return cursor.fetchone()[0]
+        conn = self._reader()
+        if domain:
+            cursor = conn.execute(
+                "SELECT COUNT(*) FROM domain_examples WHERE domain = ?",
+                (domain,)
+            )
+        else:
+            cursor = conn.execute("SELECT COUNT(*) FROM domain_examples")
+        return cursor.fetchone()[0]
@@ -2,16 +2,214 @@
 Supabase adapter using pgvector for embeddings.
 """
 
+import json
 import os
-from typing import Any
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterator
 
+import httpx
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 
-from .base import VectorStoreAdapter
+from .base import UpsertError, VectorStoreAdapter
+from .cache import EmbeddingCache
+from ..embedders import Embedder, OpenAIEmbedder
 from ..types import ContrastExample
 
 
-class SupabaseAdapter(VectorStoreAdapter):
+# Versioned search RPC; see supabase/migrations/002_search_v2_hnsw.sql
+SEARCH_FUNCTION = "search_domain_examples_v2"
+
+# Grouped count RPC; see supabase/migrations/003_domain_counts.sql
+COUNT_FUNCTION = "domain_example_counts"
+
+# PostgREST / Postgres codes for a function that doesn't exist
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+# Postgres errors worth retrying (besides connection classes 08 and 53):
+# serialization failure, deadlock, statement timeout, server shutdown
+TRANSIENT_SQLSTATES = frozenset({"40001", "40P01", "57014", "57P01", "57P02", "57P03"})
+
+
+def example_records(
+    examples: list[ContrastExample],
+    embeddings: list[list[float]],
+) -> list[dict[str, Any]]:
+    """Table rows for examples; one statement can't upsert a key twice, so the last wins."""
+    records: dict[tuple[str, str], dict[str, Any]] = {}
+    for example, embedding in zip(examples, embeddings):
+        records[(example.domain, example.id)] = {
+            "domain": example.domain,
+            "category": example.category,
+            "example_id": example.id,
+            "tags": example.tags,
+            "content": {
+                "id": example.id,
+                "tags": example.tags,
+                "weak_content": example.weak_content,
+                "weak_reasons": example.weak_reasons,
+                "strong_content": example.strong_content,
+                "strong_reasons": example.strong_reasons,
+                "teaching_point": example.teaching_point,
+                "when_to_apply": example.when_to_apply,
+            },
+            "embedding": [float(x) for x in embedding],
+        }
+    return list(records.values())
+
+
+def chunk_records(
+    records: list[dict[str, Any]],
+    max_rows: int,
+    max_bytes: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Split records into chunks bounded by row count and JSON size."""
+    chunk: list[dict[str, Any]] = []
+    chunk_bytes = 0
+    for record in records:
+        size = len(json.dumps(record))
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(record)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def parse_vector(value: str | list[float]) -> list[float]:
+    """pgvector values arrive as text, e.g. "[0.1,0.2,...]"."""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def row_to_example(
+    row: dict[str, Any],
+    embedding: list[float] | None = None,
+) -> ContrastExample:
+    """Build a ContrastExample from a search function row."""
+    content = row["content"]
+    return ContrastExample(
+        id=content["id"],
+        domain=row["domain"],
+        category=row["category"],
+        tags=content.get("tags", []),
+        weak_content=content.get("weak_content", ""),
+        weak_reasons=content.get("weak_reasons", []),
+        strong_content=content.get("strong_content", ""),
+        strong_reasons=content.get("strong_reasons", []),
+        teaching_point=content.get("teaching_point", ""),
+        when_to_apply=content.get("when_to_apply", ""),
+        similarity=row.get("similarity"),
+        embedding=embedding,
+    )
+
+
+class _SupabaseSettings:
+    """Connection, write and search settings shared by the sync and async adapters."""
+
+    def __init__(
+        self,
+        url: str | None = None,
+        key: str | None = None,
+        table: str = "domain_examples",
+        embedder: Embedder | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        query_cache: EmbeddingCache | None = None,
+        chunk_rows: int = 500,
+        chunk_bytes: int = 4 * 1024 * 1024,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        min_similarity: float | None = None,
+        hnsw_ef_search: int | None = None,
+        ivfflat_probes: int | None = None,
+        count_cache_ttl: float = 30.0,
+        estimated_counts: bool = False,
+    ):
+        self.url = url or os.environ.get("EXPERTISE_SUPABASE_URL")
+        self.key = key or os.environ.get("EXPERTISE_SUPABASE_KEY")
+        self.table = table
+        self.embedder = embedder or OpenAIEmbedder()
+        self.embedding_cache = embedding_cache
+        self.query_cache = query_cache
+        self.chunk_rows = max(1, chunk_rows)
+        self.chunk_bytes = chunk_bytes
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_similarity = min_similarity
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivfflat_probes = ivfflat_probes
+        self.count_cache_ttl = count_cache_ttl
+        self.estimated_counts = estimated_counts
+        self._counts: dict[str, int] | None = None
+        self._counts_at = 0.0
+        self._grouped_counts = True
+
+        if not self.url or not self.key:
+            raise ValueError(
+                "Supabase URL and key required. "
+                "Set EXPERTISE_SUPABASE_URL and EXPERTISE_SUPABASE_KEY env vars."
+            )
+
+    @property
+    def retryable_errors(self) -> tuple[type[BaseException], ...]:
+        """Exceptions that may be transient; see is_transient()."""
+        return (httpx.TransportError, APIError)
+
+    def is_transient(self, error: BaseException) -> bool:
+        """
+        Whether a failed request is worth retrying.
+
+        Network errors and timeouts are; PostgREST errors only for HTTP
+        408/429/5xx or a Postgres timeout, connection or resource error.
+        Bad requests, auth failures and constraint violations are not.
+        """
+        if isinstance(error, httpx.TransportError):
+            return True
+        if not isinstance(error, APIError):
+            return False
+        code = str(error.code or "")
+        if code.isdigit() and len(code) == 3:
+            return code in ("408", "429") or code.startswith("5")
+        return code in TRANSIENT_SQLSTATES or code[:2] in ("08", "53")
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff, as in the indexing pipeline."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _search_params(
+        self,
+        vector: list[float],
+        domain: str | None,
+        category: str | None,
+        limit: int,
+        tags: list[str] | None,
+    ) -> dict[str, Any]:
+        """Arguments for the search function; only set filters are sent."""
+        params: dict[str, Any] = {
+            "query_embedding": [float(x) for x in vector],
+            "match_count": limit,
+        }
+        if domain:
+            params["filter_domain"] = domain
+        if category:
+            params["filter_category"] = category
+        if tags:
+            params["filter_tags"] = tags
+        if self.min_similarity is not None:
+            params["min_similarity"] = self.min_similarity
+        if self.hnsw_ef_search:
+            params["hnsw_ef_search"] = self.hnsw_ef_search
+        if self.ivfflat_probes:
+            params["ivfflat_probes"] = self.ivfflat_probes
+        return params
+
+
+class SupabaseAdapter(_SupabaseSettings, VectorStoreAdapter):
     """
     Vector store adapter using Supabase with pgvector.
 
@@ -21,15 +219,36 @@ class SupabaseAdapter(VectorStoreAdapter):
             domain TEXT NOT NULL,
             category TEXT NOT NULL,
             example_id TEXT NOT NULL,
+            tags TEXT[] DEFAULT '{}',
             content JSONB NOT NULL,
             embedding vector(1536),
             created_at TIMESTAMPTZ DEFAULT NOW(),
             UNIQUE(domain, example_id)
         );
 
+        CREATE INDEX ON domain_examples USING GIN (tags);
+
         CREATE INDEX ON domain_examples
-            USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 100);
+            USING hnsw (embedding vector_cosine_ops);
+
+    and the search_domain_examples_v2 function (see SUPABASE_SCHEMA and
+    supabase/migrations/). Domain, category, tag and `min_similarity`
+    filters run in Postgres; `hnsw_ef_search` or `ivfflat_probes` set the
+    index's recall/latency trade-off for each query.
+
+    count() reads per-domain counts for every domain with one RPC
+    (domain_example_counts) and caches them for `count_cache_ttl`
+    seconds; this adapter's own writes clear the cache. With
+    `estimated_counts`, counts come from Postgres planner statistics;
+    domains too small to appear there are counted exactly by count(domain)
+    but are missing from domain_counts() and the count() total.
+
+    Writes are sent as multi-row upserts in chunks of at most
+    `chunk_rows` records and roughly `chunk_bytes` of JSON; transient
+    failures (see is_transient()) are retried with exponential backoff.
+    index() uploads one embedded batch while the next is being embedded.
+    Chunks that still fail are reported together in an UpsertError once
+    the rest have been written; any other error is raised at once.
     """
 
     def __init__(
@@ -37,55 +256,119 @@ class SupabaseAdapter(VectorStoreAdapter):
         url: str | None = None,
         key: str | None = None,
         table: str = "domain_examples",
+        embedder: Embedder | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        query_cache: EmbeddingCache | None = None,
+        chunk_rows: int = 500,
+        chunk_bytes: int = 4 * 1024 * 1024,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        min_similarity: float | None = None,
+        hnsw_ef_search: int | None = None,
+        ivfflat_probes: int | None = None,
+        count_cache_ttl: float = 30.0,
+        estimated_counts: bool = False,
     ):
-        self.url = url or os.environ.get("EXPERTISE_SUPABASE_URL")
-        self.key = key or os.environ.get("EXPERTISE_SUPABASE_KEY")
-        self.table = table
-
-        if not self.url or not self.key:
-            raise ValueError(
-                "Supabase URL and key required. "
-                "Set EXPERTISE_SUPABASE_URL and EXPERTISE_SUPABASE_KEY env vars."
-            )
-
+        super().__init__(
+            url=url,
+            key=key,
+            table=table,
+            embedder=embedder,
+            embedding_cache=embedding_cache,
+            query_cache=query_cache,
+            chunk_rows=chunk_rows,
+            chunk_bytes=chunk_bytes,
+            max_retries=max_retries,
+            base_delay=base_delay,
+            max_delay=max_delay,
+            min_similarity=min_similarity,
+            hnsw_ef_search=hnsw_ef_search,
+            ivfflat_probes=ivfflat_probes,
+            count_cache_ttl=count_cache_ttl,
+            estimated_counts=estimated_counts,
+        )
         self.client: Client = create_client(self.url, self.key)
 
     def index(self, examples: list[ContrastExample]) -> int:
-        """Index examples into Supabase."""
-        indexed = 0
-
-        for example in examples:
-            # Generate embedding
-            text = self.example_to_text(example)
-            embedding = self.get_embedding(text)
-
-            # Prepare record
-            record = {
-                "domain": example.domain,
-                "category": example.category,
-                "example_id": example.id,
-                "content": {
-                    "id": example.id,
-                    "tags": example.tags,
-                    "weak_content": example.weak_content,
-                    "weak_reasons": example.weak_reasons,
-                    "strong_content": example.strong_content,
-                    "strong_reasons": example.strong_reasons,
-                    "teaching_point": example.teaching_point,
-                    "when_to_apply": example.when_to_apply,
-                },
-                "embedding": embedding,
-            }
-
-            # Upsert (insert or update)
-            self.client.table(self.table).upsert(
-                record,
-                on_conflict="domain,example_id",
-            ).execute()
+        """
+        Index examples into Supabase.
+
+        Examples are embedded in request-sized batches; each batch is
+        uploaded on a background thread while the next one is embedded.
+        """
+        texts = [self.example_to_text(ex) for ex in examples]
+        written = 0
+        failures: list[tuple[str, str]] = []
+
+        def collect(upload: Future):
+            nonlocal written
+            try:
+                written += upload.result()
+            except UpsertError as e:
+                written += e.written
+                failures.extend(e.failures)
+
+        with ThreadPoolExecutor(max_workers=1) as uploader:
+            upload: Future | None = None
+            for batch in self.embedder.batches(texts):
+                embeddings = self.embed_texts([texts[i] for i in batch])
+                if upload is not None:
+                    collect(upload)
+                upload = uploader.submit(
+                    self.upsert, [examples[i] for i in batch], embeddings,
+                )
+            if upload is not None:
+                collect(upload)
+
+        if failures:
+            raise UpsertError(written, failures)
+        return written
 
-            indexed += 1
+    def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """
+        Write examples with precomputed embeddings into Supabase.
+
+        Raises:
+            UpsertError: If some chunks failed after retries; every other
+                chunk has been written
+            APIError: On a non-transient error, e.g. a constraint violation
+        """
+        written = 0
+        failures: list[tuple[str, str]] = []
+        records = example_records(examples, embeddings)
+        for chunk in chunk_records(records, self.chunk_rows, self.chunk_bytes):
+            try:
+                self._upsert_chunk(chunk)
+            except self.retryable_errors as e:
+                if not self.is_transient(e):
+                    raise
+                failures.extend((record["example_id"], str(e)) for record in chunk)
+            else:
+                written += len(chunk)
+        self._counts = None
 
-        return indexed
+        if failures:
+            raise UpsertError(written, failures)
+        return written
+
+    def _upsert_chunk(self, chunk: list[dict[str, Any]]):
+        """Upsert one chunk in a single request, retrying transient failures."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.client.table(self.table).upsert(
+                    chunk,
+                    on_conflict="domain,example_id",
+                ).execute()
+                return
+            except self.retryable_errors as e:
+                if not self.is_transient(e) or attempt == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
 
     def search(
         self,
@@ -93,60 +376,96 @@ class SupabaseAdapter(VectorStoreAdapter):
         domain: str | None = None,
         category: str | None = None,
         limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
     ) -> list[ContrastExample]:
         """Search for similar examples using vector similarity."""
-        # Get query embedding
-        query_embedding = self.get_embedding(query)
+        return self.search_by_vector(
+            self.embed_query(query), domain, category, limit, tags, include_embeddings,
+        )
 
-        # Build RPC call for similarity search
-        # This requires a Supabase function - see schema below
-        params: dict[str, Any] = {
-            "query_embedding": query_embedding,
-            "match_count": limit,
-        }
+    def search_by_vector(
+        self,
+        vector: list[float],
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """
+        Search with a precomputed query embedding.
 
-        if domain:
-            params["filter_domain"] = domain
-        if category:
-            params["filter_category"] = category
+        Filters run inside Postgres; tags use the GIN index on `tags`.
+        """
+        params = self._search_params(vector, domain, category, limit, tags)
 
         # Call the similarity search function
         response = self.client.rpc(
-            "search_domain_examples",
+            SEARCH_FUNCTION,
             params,
         ).execute()
 
-        # Convert to ContrastExample objects
-        examples = []
-        for row in response.data:
-            content = row["content"]
-            example = ContrastExample(
-                id=content["id"],
-                domain=row["domain"],
-                category=row["category"],
-                tags=content.get("tags", []),
-                weak_content=content.get("weak_content", ""),
-                weak_reasons=content.get("weak_reasons", []),
-                strong_content=content.get("strong_content", ""),
-                strong_reasons=content.get("strong_reasons", []),
-                teaching_point=content.get("teaching_point", ""),
-                when_to_apply=content.get("when_to_apply", ""),
-                similarity=row.get("similarity"),
-            )
-            examples.append(example)
+        # The search function doesn't return vectors; fetch them by row id
+        embeddings: dict[str, list[float]] = {}
+        if include_embeddings and response.data:
+            vectors = self.client.table(self.table).select("id, embedding").in_(
+                "id", [row["id"] for row in response.data]
+            ).execute()
+            for row in vectors.data:
+                embeddings[row["id"]] = parse_vector(row["embedding"])
 
-        return examples
+        return [row_to_example(row, embeddings.get(row["id"])) for row in response.data]
 
     def delete_domain(self, domain: str) -> int:
         """Delete all examples for a domain."""
         response = self.client.table(self.table).delete().eq(
             "domain", domain
         ).execute()
+        self._counts = None
         return len(response.data) if response.data else 0
 
     def count(self, domain: str | None = None) -> int:
-        """Count indexed examples."""
-        query = self.client.table(self.table).select("id", count="exact")
+        """Count indexed examples (cached; see domain_counts())."""
+        if not self._grouped_counts:
+            return self._count_exact(domain)
+        try:
+            counts = self.domain_counts()
+        except APIError as e:
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            # Database without migration 003; don't try the RPC again
+            self._grouped_counts = False
+            return self._count_exact(domain)
+        if domain:
+            if domain not in counts and self.estimated_counts:
+                # Too rare to appear in the planner statistics
+                return self._count_exact(domain)
+            return counts.get(domain, 0)
+        return sum(counts.values())
+
+    def domain_counts(self, exact: bool = False) -> dict[str, int]:
+        """
+        Example count per domain, fetched in one RPC and cached briefly.
+
+        `exact` bypasses the cache and estimated counts.
+        """
+        now = time.monotonic()
+        if exact:
+            response = self.client.rpc(COUNT_FUNCTION, {"estimated": False}).execute()
+            return {row["domain"]: int(row["count"]) for row in response.data or []}
+        if self._counts is None or now - self._counts_at > self.count_cache_ttl:
+            response = self.client.rpc(
+                COUNT_FUNCTION,
+                {"estimated": self.estimated_counts},
+            ).execute()
+            self._counts = {row["domain"]: int(row["count"]) for row in response.data or []}
+            self._counts_at = now
+        return self._counts
+
+    def _count_exact(self, domain: str | None = None) -> int:
+        """Count with a plain table query; needs no database functions."""
+        query = self.client.table(self.table).select("id", count="exact", head=True)
         if domain:
             query = query.eq("domain", domain)
         response = query.execute()
@@ -164,55 +483,166 @@ CREATE TABLE IF NOT EXISTS domain_examples (
     domain TEXT NOT NULL,
     category TEXT NOT NULL,
     example_id TEXT NOT NULL,
+    tags TEXT[] DEFAULT '{}',
     content JSONB NOT NULL,
     embedding vector(1536),
     created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
 
     UNIQUE(domain, example_id)
 );
 
--- Create vector index for similarity search
-CREATE INDEX IF NOT EXISTS domain_examples_embedding_idx
+-- Tables created before tag filtering / replica sync were added
+ALTER TABLE domain_examples ADD COLUMN IF NOT EXISTS tags TEXT[] DEFAULT '{}';
+ALTER TABLE domain_examples ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+-- Rows written before the tags column was filled only carry tags in content
+UPDATE domain_examples
+SET tags = ARRAY(SELECT jsonb_array_elements_text(content->'tags'))
+WHERE tags = '{}' AND content ? 'tags';
+
+-- Keep updated_at current on upserts, for replica delta sync
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_domain_examples_updated_at ON domain_examples;
+CREATE TRIGGER update_domain_examples_updated_at
+    BEFORE UPDATE ON domain_examples
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- HNSW vector index (see supabase/migrations/002 for the IVFFlat alternative)
+DROP INDEX IF EXISTS domain_examples_embedding_idx;
+CREATE INDEX IF NOT EXISTS idx_domain_examples_embedding_hnsw
     ON domain_examples
-    USING ivfflat (embedding vector_cosine_ops)
-    WITH (lists = 100);
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
 
 -- Create indexes for filtering
 CREATE INDEX IF NOT EXISTS domain_examples_domain_idx ON domain_examples(domain);
 CREATE INDEX IF NOT EXISTS domain_examples_category_idx ON domain_examples(domain, category);
+CREATE INDEX IF NOT EXISTS domain_examples_tags_idx ON domain_examples USING GIN (tags);
+CREATE INDEX IF NOT EXISTS idx_domain_examples_updated ON domain_examples(updated_at, id);
 
--- Create similarity search function
-CREATE OR REPLACE FUNCTION search_domain_examples(
+-- Versioned search function; drop earlier signatures, which would
+-- otherwise remain as ambiguous overloads
+DROP FUNCTION IF EXISTS search_domain_examples(vector, text, text, text[], int, float);
+DROP FUNCTION IF EXISTS search_domain_examples(vector, int, text, text, text[]);
+DROP FUNCTION IF EXISTS search_domain_examples(vector, int, text, text);
+CREATE OR REPLACE FUNCTION search_domain_examples_v2(
     query_embedding vector(1536),
-    match_count int DEFAULT 5,
-    filter_domain text DEFAULT NULL,
-    filter_category text DEFAULT NULL
+    match_count INT DEFAULT 5,
+    filter_domain TEXT DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    filter_tags TEXT[] DEFAULT NULL,
+    min_similarity FLOAT DEFAULT NULL,
+    ivfflat_probes INT DEFAULT NULL,
+    hnsw_ef_search INT DEFAULT NULL
 )
 RETURNS TABLE (
-    id uuid,
-    domain text,
-    category text,
-    example_id text,
-    content jsonb,
-    similarity float
+    id UUID,
+    domain TEXT,
+    category TEXT,
+    example_id TEXT,
+    tags TEXT[],
+    content JSONB,
+    similarity FLOAT
 )
 LANGUAGE plpgsql
 AS $$
 BEGIN
+    IF ivfflat_probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', ivfflat_probes::text, true);
+    END IF;
+    IF hnsw_ef_search IS NOT NULL THEN
+        PERFORM set_config('hnsw.ef_search', hnsw_ef_search::text, true);
+    END IF;
+
     RETURN QUERY
     SELECT
         de.id,
         de.domain,
         de.category,
         de.example_id,
+        de.tags,
         de.content,
-        1 - (de.embedding <=> query_embedding) as similarity
+        1 - (de.embedding <=> query_embedding) AS similarity
     FROM domain_examples de
     WHERE
-        (filter_domain IS NULL OR de.domain = filter_domain)
+        de.embedding IS NOT NULL
+        AND (filter_domain IS NULL OR de.domain = filter_domain)
         AND (filter_category IS NULL OR de.category = filter_category)
+        AND (filter_tags IS NULL OR de.tags && filter_tags)
+        -- Written as a distance bound so the ORDER BY can still use the index
+        AND (min_similarity IS NULL OR de.embedding <=> query_embedding <= 1 - min_similarity)
     ORDER BY de.embedding <=> query_embedding
     LIMIT match_count;
 END;
 $$;
+
+-- Compatibility wrapper with the parameters older adapters send
+CREATE OR REPLACE FUNCTION search_domain_examples(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    filter_domain TEXT DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    filter_tags TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    domain TEXT,
+    category TEXT,
+    example_id TEXT,
+    tags TEXT[],
+    content JSONB,
+    similarity FLOAT
+)
+LANGUAGE SQL
+AS $$
+    SELECT * FROM search_domain_examples_v2(
+        query_embedding, match_count, filter_domain, filter_category, filter_tags
+    );
+$$;
+
+-- Per-domain counts for count() (see supabase/migrations/003)
+CREATE OR REPLACE FUNCTION domain_example_counts(estimated BOOLEAN DEFAULT false)
+RETURNS TABLE (
+    domain TEXT,
+    count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF estimated THEN
+        RETURN QUERY
+        SELECT
+            mcv.domain,
+            round(mcv.frequency * greatest(c.reltuples, 0))::BIGINT
+        FROM pg_stats s
+        CROSS JOIN LATERAL unnest(
+            s.most_common_vals::text::text[],
+            s.most_common_freqs
+        ) AS mcv(domain, frequency)
+        JOIN pg_class c ON c.oid = 'domain_examples'::regclass
+        WHERE s.schemaname = current_schema()
+            AND s.tablename = 'domain_examples'
+            AND s.attname = 'domain';
+        -- Without statistics at all, fall back to exact counts
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    SELECT de.domain, COUNT(*)::BIGINT
+    FROM domain_examples de
+    GROUP BY de.domain;
+END;
+$$;
 """
@@ -0,0 +1,283 @@
+"""
+Asyncio Supabase adapter for services that fan out retrieval.
+"""
+
+import asyncio
+import time
+from typing import Any
+
+import httpx
+from postgrest.exceptions import APIError
+from supabase import AsyncClient, AsyncClientOptions, create_async_client
+
+from .base import AsyncVectorStoreAdapter, UpsertError
+from .supabase import (
+    COUNT_FUNCTION,
+    MISSING_FUNCTION_CODES,
+    SEARCH_FUNCTION,
+    _SupabaseSettings,
+    chunk_records,
+    example_records,
+    parse_vector,
+    row_to_example,
+)
+from ..types import ContrastExample
+
+
+class AsyncSupabaseAdapter(_SupabaseSettings, AsyncVectorStoreAdapter):
+    """
+    Awaitable SupabaseAdapter on the async Supabase/PostgREST client.
+
+    Every request goes through one pooled httpx.AsyncClient, so
+    concurrent searches (e.g. search_many() across several domains) run
+    in parallel over kept-alive connections and take about one RPC's
+    latency. Options, schema and behavior match SupabaseAdapter; index()
+    uploads chunks concurrently while later batches are embedded.
+
+    Usage:
+        async with AsyncSupabaseAdapter(url, key) as store:
+            results = await store.search_many([
+                SearchRequest(query, domain=domain) for domain in domains
+            ])
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        key: str | None = None,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        **options: Any,
+    ):
+        """Initialize adapter.
+
+        Args:
+            url: Supabase project URL (default: EXPERTISE_SUPABASE_URL).
+            key: Supabase key (default: EXPERTISE_SUPABASE_KEY).
+            max_connections: Size of the shared HTTP connection pool; also
+                bounds concurrent chunk uploads.
+            timeout: Per-request timeout in seconds.
+            **options: Any other SupabaseAdapter option.
+        """
+        super().__init__(url=url, key=key, **options)
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        # Created on first use, inside the event loop that uses them
+        self.http: httpx.AsyncClient | None = None
+        self._client: AsyncClient | None = None
+        self._client_lock: asyncio.Lock | None = None
+        self._uploads: asyncio.Semaphore | None = None
+
+    async def client(self) -> AsyncClient:
+        """
+        The Supabase client, created on first use.
+
+        The connection pool, client and upload semaphore belong to the
+        event loop that first calls this; after close() the next call
+        creates new ones, so the adapter can move to another loop.
+        """
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._client is None:
+                self.http = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                )
+                self._uploads = asyncio.Semaphore(self.max_connections)
+                self._client = await create_async_client(
+                    self.url,
+                    self.key,
+                    options=AsyncClientOptions(httpx_client=self.http),
+                )
+        return self._client
+
+    async def close(self):
+        """Close the shared connection pool; later calls open a new one."""
+        http = self.http
+        self.http = None
+        self._client = None
+        self._client_lock = None
+        self._uploads = None
+        if http is not None:
+            await http.aclose()
+
+    async def index(self, examples: list[ContrastExample]) -> int:
+        """
+        Index examples into Supabase.
+
+        Examples are embedded in request-sized batches on a worker thread;
+        each batch's upload starts as soon as it is embedded.
+        """
+        texts = [self.example_to_text(ex) for ex in examples]
+        uploads = []
+        try:
+            for batch in self.embedder.batches(texts):
+                embeddings = await asyncio.to_thread(self.embed_texts, [texts[i] for i in batch])
+                uploads.append(asyncio.create_task(
+                    self.upsert([examples[i] for i in batch], embeddings)
+                ))
+        except BaseException:
+            # Don't leave uploads running (or their errors unretrieved)
+            for upload in uploads:
+                upload.cancel()
+            await asyncio.gather(*uploads, return_exceptions=True)
+            raise
+
+        written = 0
+        failures: list[tuple[str, str]] = []
+        for result in await asyncio.gather(*uploads, return_exceptions=True):
+            if isinstance(result, UpsertError):
+                written += result.written
+                failures.extend(result.failures)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                written += result
+
+        if failures:
+            raise UpsertError(written, failures)
+        return written
+
+    async def upsert(
+        self,
+        examples: list[ContrastExample],
+        embeddings: list[list[float]],
+    ) -> int:
+        """
+        Write examples with precomputed embeddings, uploading chunks concurrently.
+
+        Raises:
+            UpsertError: If some chunks failed after retries; every other
+                chunk has been written
+        """
+        records = example_records(examples, embeddings)
+        chunks = list(chunk_records(records, self.chunk_rows, self.chunk_bytes))
+        results = await asyncio.gather(
+            *(self._upsert_chunk(chunk) for chunk in chunks),
+            return_exceptions=True,
+        )
+        self._counts = None
+
+        written = 0
+        failures: list[tuple[str, str]] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, self.retryable_errors) and self.is_transient(result):
+                failures.extend((record["example_id"], str(result)) for record in chunk)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                written += len(chunk)
+
+        if failures:
+            raise UpsertError(written, failures)
+        return written
+
+    async def _upsert_chunk(self, chunk: list[dict[str, Any]]):
+        """Upsert one chunk in a single request, retrying transient failures."""
+        client = await self.client()
+        # Taken together with the client: a concurrent close() clears both
+        uploads = self._uploads
+        async with uploads:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await client.table(self.table).upsert(
+                        chunk,
+                        on_conflict="domain,example_id",
+                    ).execute()
+                    return
+                except self.retryable_errors as e:
+                    if not self.is_transient(e) or attempt == self.max_retries:
+                        raise
+                    await asyncio.sleep(self._retry_delay(attempt))
+
+    async def search(
+        self,
+        query: str,
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Search for similar examples using vector similarity."""
+        vector = await asyncio.to_thread(self.embed_query, query)
+        return await self.search_by_vector(
+            vector, domain, category, limit, tags, include_embeddings,
+        )
+
+    async def search_by_vector(
+        self,
+        vector: list[float],
+        domain: str | None = None,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[ContrastExample]:
+        """Search with a precomputed query embedding; filters run inside Postgres."""
+        client = await self.client()
+        response = await client.rpc(
+            SEARCH_FUNCTION,
+            self._search_params(vector, domain, category, limit, tags),
+        ).execute()
+
+        # The search function doesn't return vectors; fetch them by row id
+        embeddings: dict[str, list[float]] = {}
+        if include_embeddings and response.data:
+            vectors = await client.table(self.table).select("id, embedding").in_(
+                "id", [row["id"] for row in response.data]
+            ).execute()
+            for row in vectors.data:
+                embeddings[row["id"]] = parse_vector(row["embedding"])
+
+        return [row_to_example(row, embeddings.get(row["id"])) for row in response.data]
+
+    async def delete_domain(self, domain: str) -> int:
+        """Delete all examples for a domain."""
+        client = await self.client()
+        response = await client.table(self.table).delete().eq(
+            "domain", domain
+        ).execute()
+        self._counts = None
+        return len(response.data) if response.data else 0
+
+    async def count(self, domain: str | None = None) -> int:
+        """Count indexed examples (cached; see domain_counts())."""
+        if self._grouped_counts:
+            try:
+                counts = await self.domain_counts()
+            except APIError as e:
+                if e.code not in MISSING_FUNCTION_CODES:
+                    raise
+                # Database without migration 003; don't try the RPC again
+                self._grouped_counts = False
+            else:
+                if not domain:
+                    return sum(counts.values())
+                if domain in counts or not self.estimated_counts:
+                    return counts.get(domain, 0)
+                # Too rare to appear in the planner statistics; count exactly
+
+        client = await self.client()
+        query = client.table(self.table).select("id", count="exact", head=True)
+        if domain:
+            query = query.eq("domain", domain)
+        response = await query.execute()
+        return response.count or 0
+
+    async def domain_counts(self) -> dict[str, int]:
+        """Example count per domain, fetched in one RPC and cached briefly."""
+        now = time.monotonic()
+        if self._counts is None or now - self._counts_at > self.count_cache_ttl:
+            client = await self.client()
+            response = await client.rpc(
+                COUNT_FUNCTION,
+                {"estimated": self.estimated_counts},
+            ).execute()
+            self._counts = {row["domain"]: int(row["count"]) for row in response.data or []}
+            self._counts_at = now
+        return self._counts
@@ -0,0 +1,39 @@
+"""
+Approximate nearest neighbor indexes for the local vector store.
+
+Available indexes:
+- IVFFlatIndex: k-means coarse quantizer, tune recall with `nprobe`
+- HNSWIndex: layered proximity graph, tune with `M` / `ef_search`
+
+VectorCompressor provides float16/int8 scalar quantization with optional
+PCA or truncation, for compact in-memory matrices.
+"""
+
+from typing import Any
+
+from .base import ANNIndex
+from .ivf import IVFFlatIndex
+from .hnsw import HNSWIndex
+from .quantize import VectorCompressor
+
+INDEX_TYPES: dict[str, type[ANNIndex]] = {
+    IVFFlatIndex.kind: IVFFlatIndex,
+    HNSWIndex.kind: HNSWIndex,
+}
+
+
+def create_index(kind: str, **params: Any) -> ANNIndex:
+    """Create an empty index of the given kind ("ivf_flat" or "hnsw")."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown ANN index type: {kind}")
+    return INDEX_TYPES[kind](**params)
+
+
+__all__ = [
+    "ANNIndex",
+    "IVFFlatIndex",
+    "HNSWIndex",
+    "VectorCompressor",
+    "INDEX_TYPES",
+    "create_index",
+]
@@ -0,0 +1,258 @@
+"""
+Base interface for approximate nearest neighbor indexes.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+
+# Rebuild an index once this share of its stored vectors are tombstones
+COMPACT_RATIO = 0.25
+
+# ...but not for tiny indexes, where a few replacements cross the ratio
+COMPACT_MIN_SIZE = 256
+
+
+class ANNIndex(ABC):
+    """
+    Abstract base class for in-memory ANN indexes over unit vectors.
+
+    Vectors are identified by caller-supplied int64 ids (SQLite row ids).
+    Similarity is the inner product, i.e. cosine for normalized vectors.
+    Removed (and replaced) ids are tombstoned; once tombstones make up
+    COMPACT_RATIO of the index it is rebuilt from the live vectors.
+    """
+
+    kind: str = ""
+
+    def __init__(self, dimension: int | None = None):
+        self.dimension = dimension
+        self._vectors = np.empty((0, dimension or 0), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._deleted = np.empty(0, dtype=bool)
+        self._positions: dict[int, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of live (non-tombstoned) vectors."""
+        return len(self._positions)
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """Current build and search parameters."""
+        return {}
+
+    def set_params(self, **params: Any) -> None:
+        """Update search-time parameters (e.g. nprobe, ef_search)."""
+        for name, value in params.items():
+            if name not in self.params:
+                raise ValueError(f"Unknown {self.kind} parameter: {name}")
+            setattr(self, name, value)
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Ids of live vectors."""
+        return self._ids[:self._size][~self._deleted[:self._size]]
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Add vectors. Ids already present are replaced.
+
+        Args:
+            ids: int64 ids, one per row
+            vectors: (n, dim) unit vectors
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(ids) == 0:
+            return
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+            self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+
+        self._tombstone(ids)
+        start = self._size
+        self._reserve(start + len(ids))
+        self._vectors[start:start + len(ids)] = vectors
+        self._ids[start:start + len(ids)] = ids
+        self._deleted[start:start + len(ids)] = False
+        self._size += len(ids)
+        for offset, row_id in enumerate(ids.tolist()):
+            self._positions[row_id] = start + offset
+
+        self._insert(np.arange(start, self._size))
+        self._compact_if_needed()
+
+    def remove(self, ids: np.ndarray) -> None:
+        """Tombstone vectors by id."""
+        self._tombstone(ids)
+        self._compact_if_needed()
+
+    def _tombstone(self, ids: np.ndarray) -> None:
+        for row_id in np.asarray(ids, dtype=np.int64).tolist():
+            position = self._positions.pop(row_id, None)
+            if position is not None:
+                self._deleted[position] = True
+
+    def _compact_if_needed(self) -> None:
+        tombstones = self._size - len(self)
+        if self._size >= COMPACT_MIN_SIZE and tombstones > COMPACT_RATIO * self._size:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rebuild the index from its live vectors, dropping tombstones."""
+        live = np.flatnonzero(~self._deleted[:self._size])
+        ids = self._ids[live].copy()
+        vectors = self._vectors[live].copy()
+        self._vectors = np.empty((0, self.dimension), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._deleted = np.empty(0, dtype=bool)
+        self._positions = {}
+        self._size = 0
+        self._reset()
+        self.add(ids, vectors)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find approximate nearest neighbors.
+
+        Args:
+            query: Unit query vector
+            k: Number of results
+            allowed: Optional ids to restrict results to
+
+        Returns:
+            (ids, scores), best first
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if len(self) == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        allowed_mask = None
+        if allowed is not None:
+            allowed_mask = np.isin(self._ids[:self._size], allowed)
+
+        positions, scores = self._search(query, k, allowed_mask)
+        available = len(self) if allowed_mask is None else int(
+            (allowed_mask & ~self._deleted[:self._size]).sum()
+        )
+        if len(positions) < min(k, available):
+            # Selective filters (or tombstones, or sparse probed lists) can
+            # starve the graph/list walk; fall back to an exact scan
+            positions, scores = self._exact(query, k, allowed_mask)
+        return self._ids[positions], scores
+
+    def _exact(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed_mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Brute-force search over live (and allowed) vectors."""
+        live = ~self._deleted[:self._size]
+        if allowed_mask is not None:
+            live &= allowed_mask
+        positions = np.flatnonzero(live)
+        scores = self._vectors[positions] @ query
+        order = np.argsort(-scores, kind="stable")[:k]
+        return positions[order], scores[order]
+
+    def _reserve(self, capacity: int) -> None:
+        """Grow backing arrays geometrically."""
+        if capacity <= len(self._ids):
+            return
+        new_capacity = max(capacity, 2 * len(self._ids), 64)
+        vectors = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+        self._ids = np.resize(self._ids, new_capacity)
+        self._deleted = np.resize(self._deleted, new_capacity)
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Drop index-specific structures before a rebuild."""
+        pass
+
+    @abstractmethod
+    def _insert(self, positions: np.ndarray) -> None:
+        """Index newly appended vectors."""
+        pass
+
+    @abstractmethod
+    def _search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed_mask: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return (positions, scores) of approximate neighbors, best first."""
+        pass
+
+    @abstractmethod
+    def _state(self) -> dict[str, np.ndarray]:
+        """Index-specific arrays to persist."""
+        pass
+
+    @abstractmethod
+    def _restore(self, state: dict[str, np.ndarray]) -> None:
+        """Rebuild index-specific structures from persisted arrays."""
+        pass
+
+    def save(self, path: Path | str, metadata: dict[str, Any] | None = None) -> None:
+        """Persist the index to an .npz file (written atomically)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "kind": self.kind,
+            "dimension": self.dimension,
+            "params": self.params,
+            "metadata": metadata or {},
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+                vectors=self._vectors[:self._size],
+                ids=self._ids[:self._size],
+                deleted=self._deleted[:self._size],
+                **self._state(),
+            )
+        tmp_path.replace(path)
+
+    @staticmethod
+    def read_header(path: Path | str) -> dict[str, Any]:
+        """Read kind, params and metadata without loading vectors."""
+        with np.load(path, allow_pickle=False) as data:
+            return json.loads(data["header"].tobytes().decode("utf-8"))
+
+    @classmethod
+    def load(cls, path: Path | str) -> "ANNIndex":
+        """Load an index saved with save()."""
+        from . import INDEX_TYPES
+
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            index_cls = INDEX_TYPES[header["kind"]]
+            index = index_cls(**header["params"])
+            index.dimension = header["dimension"]
+            index._vectors = data["vectors"].copy()
+            index._ids = data["ids"].copy()
+            index._deleted = data["deleted"].copy()
+            index._size = len(index._ids)
+            index._positions = {
+                int(row_id): position
+                for position, row_id in enumerate(index._ids.tolist())
+                if not index._deleted[position]
+            }
+            index._restore({name: data[name] for name in data.files})
+        return index
@@ -0,0 +1,229 @@
+"""
+HNSW index: hierarchical navigable small world graph.
+
+Graph construction is pure Python; similarity computations for each
+candidate expansion are batched through NumPy.
+"""
+
+import heapq
+import math
+from typing import Any
+
+import numpy as np
+
+from .base import ANNIndex
+
+
+class HNSWIndex(ANNIndex):
+    """
+    Hierarchical navigable small world graph over unit vectors.
+
+    Knobs:
+        M: links per node on upper layers (2*M on layer 0); build time
+        ef_construction: candidate list size while inserting; build time
+        ef_search: candidate list size per query (higher = better recall, slower)
+    """
+
+    kind = "hnsw"
+
+    def __init__(
+        self,
+        M: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 50,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+        self._level_mult = 1.0 / math.log(max(M, 2))
+        self._reset()
+
+    def _reset(self) -> None:
+        self._rng = np.random.default_rng(self.seed)
+        # _links[level][node] -> neighbor positions
+        self._links: list[dict[int, list[int]]] = []
+        self._levels: list[int] = []
+        self._entry_point: int | None = None
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "seed": self.seed,
+        }
+
+    def _max_links(self, level: int) -> int:
+        return 2 * self.M if level == 0 else self.M
+
+    def _insert(self, positions: np.ndarray) -> None:
+        for position in positions.tolist():
+            self._insert_one(position)
+
+    def _insert_one(self, node: int) -> None:
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._levels.append(level)
+        while len(self._links) <= level:
+            self._links.append({})
+        for layer in range(level + 1):
+            self._links[layer][node] = []
+
+        if self._entry_point is None:
+            self._entry_point = node
+            return
+
+        query = self._vectors[node]
+        entry = [self._entry_point]
+        top_level = self._levels[self._entry_point]
+
+        # Greedy descent through layers above the new node's level
+        for layer in range(top_level, level, -1):
+            entry = [self._search_layer(query, entry, 1, layer)[0][1]]
+
+        for layer in range(min(level, top_level), -1, -1):
+            candidates = self._search_layer(query, entry, self.ef_construction, layer)
+            neighbors = self._select_neighbors(candidates, self.M)
+            self._links[layer][node] = neighbors
+            for neighbor in neighbors:
+                links = self._links[layer][neighbor]
+                links.append(node)
+                if len(links) > self._max_links(layer):
+                    self._prune(neighbor, layer)
+            entry = [position for _, position in candidates]
+
+        if level > top_level:
+            self._entry_point = node
+
+    def _select_neighbors(self, candidates: list[tuple[float, int]], count: int) -> list[int]:
+        """
+        Pick diverse neighbors from (score, position) candidates, best first.
+
+        A candidate is skipped when it is closer to an already selected
+        neighbor than to the base node, which keeps links spread across
+        clusters; skipped candidates backfill any remaining slots.
+        """
+        if len(candidates) <= count:
+            return [position for _, position in candidates]
+
+        positions = [position for _, position in candidates]
+        vectors = self._vectors[positions]
+        pairwise = vectors @ vectors.T
+
+        selected: list[int] = []
+        skipped: list[int] = []
+        for i, (score, _) in enumerate(candidates):
+            if len(selected) >= count:
+                break
+            if selected and pairwise[i, selected].max() > score:
+                skipped.append(i)
+            else:
+                selected.append(i)
+
+        selected.extend(skipped[:count - len(selected)])
+        return [positions[i] for i in selected]
+
+    def _prune(self, node: int, layer: int) -> None:
+        """Reduce an over-full node's links to a diverse subset."""
+        links = self._links[layer][node]
+        scores = (self._vectors[links] @ self._vectors[node]).tolist()
+        candidates = sorted(zip(scores, links), reverse=True)
+        self._links[layer][node] = self._select_neighbors(candidates, self._max_links(layer))
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry: list[int],
+        ef: int,
+        layer: int,
+    ) -> list[tuple[float, int]]:
+        """Best-first search within one layer. Returns (score, position), best first."""
+        links = self._links[layer]
+        visited = set(entry)
+        entry_scores = (self._vectors[entry] @ query).tolist()
+        # candidates: max-heap on score; results: min-heap holding the best ef
+        candidates = [(-score, position) for score, position in zip(entry_scores, entry)]
+        heapq.heapify(candidates)
+        results = [(score, position) for score, position in zip(entry_scores, entry)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_score, position = heapq.heappop(candidates)
+            if -neg_score < results[0][0] and len(results) >= ef:
+                break
+
+            fresh = [n for n in links.get(position, ()) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            scores = (self._vectors[fresh] @ query).tolist()
+            for score, neighbor in zip(scores, fresh):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    heapq.heappush(results, (score, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def _search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed_mask: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        entry = [self._entry_point]
+        for layer in range(self._levels[self._entry_point], 0, -1):
+            entry = [self._search_layer(query, entry, 1, layer)[0][1]]
+
+        # Tombstoned and filtered-out nodes still take slots in the candidate
+        # list; widen it by the share of nodes that can't be returned
+        live_share = len(self) / max(self._size, 1)
+        ef = max(self.ef_search, k)
+        ef = min(self._size, int(math.ceil(ef / max(live_share, 1e-3))))
+        candidates = self._search_layer(query, entry, ef, 0)
+        results = [
+            (score, position) for score, position in candidates
+            if not self._deleted[position]
+            and (allowed_mask is None or allowed_mask[position])
+        ][:k]
+        positions = np.array([position for _, position in results], dtype=np.int64)
+        scores = np.array([score for score, _ in results], dtype=np.float32)
+        return positions, scores
+
+    def _state(self) -> dict[str, np.ndarray]:
+        # Store each layer's adjacency in CSR form: nodes, offsets, neighbors
+        state: dict[str, np.ndarray] = {
+            "levels": np.array(self._levels, dtype=np.int32),
+            "entry_point": np.array([-1 if self._entry_point is None else self._entry_point]),
+        }
+        for layer, links in enumerate(self._links):
+            nodes = np.array(sorted(links), dtype=np.int64)
+            lengths = [len(links[node]) for node in nodes.tolist()]
+            state[f"nodes_{layer}"] = nodes
+            state[f"offsets_{layer}"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            state[f"neighbors_{layer}"] = np.array(
+                [n for node in nodes.tolist() for n in links[node]], dtype=np.int64
+            )
+        return state
+
+    def _restore(self, state: dict[str, np.ndarray]) -> None:
+        self._levels = state["levels"].tolist()
+        entry_point = int(state["entry_point"][0])
+        self._entry_point = None if entry_point < 0 else entry_point
+        self._links = []
+        layer = 0
+        while f"nodes_{layer}" in state:
+            nodes = state[f"nodes_{layer}"].tolist()
+            offsets = state[f"offsets_{layer}"].tolist()
+            neighbors = state[f"neighbors_{layer}"].tolist()
+            self._links.append({
+                node: neighbors[offsets[i]:offsets[i + 1]]
+                for i, node in enumerate(nodes)
+            })
+            layer += 1
@@ -0,0 +1,168 @@
+"""
+IVF-Flat index: k-means coarse quantizer with exact scoring inside lists.
+"""
+
+from typing import Any
+
+import numpy as np
+
+from .base import ANNIndex
+
+
+def spherical_kmeans(
+    data: np.ndarray,
+    k: int,
+    iterations: int = 20,
+    seed: int = 0,
+) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity. Returns (k, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    k = min(k, len(data))
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        counts = np.bincount(assignments, minlength=k)
+
+        # Re-seed empty clusters from random points
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        new_centroids = sums / norms
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            break
+        centroids = new_centroids
+
+    return centroids.astype(np.float32)
+
+
+class IVFFlatIndex(ANNIndex):
+    """
+    Inverted file index with flat (uncompressed) lists.
+
+    The coarse quantizer is trained on the first batch added and retrained
+    once the index grows past `retrain_factor` times its training size.
+    A query scans only the `nprobe` lists whose centroids are closest.
+
+    Knobs:
+        nlist: number of lists (build time; ~sqrt(n) is a good start)
+        nprobe: lists scanned per query (higher = better recall, slower)
+    """
+
+    kind = "ivf_flat"
+
+    def __init__(
+        self,
+        nlist: int = 100,
+        nprobe: int = 8,
+        retrain_factor: float = 4.0,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+        self._reset()
+
+    def _reset(self) -> None:
+        self._centroids: np.ndarray | None = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._lists: list[np.ndarray] = []
+        self._trained_on = 0
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "retrain_factor": self.retrain_factor,
+            "seed": self.seed,
+        }
+
+    def _insert(self, positions: np.ndarray) -> None:
+        if self._centroids is None or len(self) > self.retrain_factor * self._trained_on:
+            self._train()
+            return
+
+        self._assignments = np.resize(self._assignments, self._size)
+        self._assignments[positions] = self._assign(self._vectors[positions])
+        self._rebuild_lists()
+
+    def _train(self) -> None:
+        """Fit centroids on live vectors, compact tombstones, rebuild lists."""
+        live = np.flatnonzero(~self._deleted[:self._size])
+        self._vectors = self._vectors[live]
+        self._ids = self._ids[live]
+        self._deleted = np.zeros(len(live), dtype=bool)
+        self._size = len(live)
+        self._positions = {int(row_id): i for i, row_id in enumerate(self._ids.tolist())}
+
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(self._size, max(self.nlist * 64, 1024))
+        sample = self._vectors[rng.choice(self._size, size=sample_size, replace=False)]
+        self._centroids = spherical_kmeans(sample, self.nlist, seed=self.seed)
+        self._trained_on = self._size
+
+        self._assignments = self._assign(self._vectors)
+        self._rebuild_lists()
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest centroid for each vector, in chunks to bound memory."""
+        result = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 8192):
+            chunk = vectors[start:start + 8192]
+            result[start:start + len(chunk)] = np.argmax(chunk @ self._centroids.T, axis=1)
+        return result
+
+    def _rebuild_lists(self) -> None:
+        order = np.argsort(self._assignments[:self._size], kind="stable")
+        bounds = np.searchsorted(
+            self._assignments[order],
+            np.arange(len(self._centroids) + 1),
+        )
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+
+    def _search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed_mask: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        centroid_scores = self._centroids @ query
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+
+        positions = np.concatenate([self._lists[p] for p in probes])
+        keep = ~self._deleted[positions]
+        if allowed_mask is not None:
+            keep &= allowed_mask[positions]
+        positions = positions[keep]
+
+        scores = self._vectors[positions] @ query
+        if k < len(scores):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return positions[best], scores[best]
+
+    def _state(self) -> dict[str, np.ndarray]:
+        return {
+            "centroids": self._centroids if self._centroids is not None else np.empty((0, 0), np.float32),
+            "assignments": self._assignments[:self._size],
+            "trained_on": np.array([self._trained_on]),
+        }
+
+    def _restore(self, state: dict[str, np.ndarray]) -> None:
+        centroids = state["centroids"]
+        self._centroids = centroids.copy() if centroids.size else None
+        self._assignments = state["assignments"].copy()
+        self._trained_on = int(state["trained_on"][0])
+        if self._centroids is not None:
+            self._rebuild_lists()
@@ -0,0 +1,144 @@
+"""
+Compressed vector representations for in-memory search.
+
+Vectors are optionally reduced to fewer dimensions (uncentered PCA, which
+best preserves inner products, or plain truncation) and then stored as
+float16 or int8 with a per-vector scale. Approximate scores are used to
+shortlist candidates that callers rescore at full precision.
+
+Quantization saves memory, not arithmetic: NumPy has no BLAS kernel for
+int8 or float16 products, so codes are widened to float32 in blocks and
+scored with the same float32 matmul (float16 decoding is slower still).
+Only a reduced `dimension` makes scoring faster.
+"""
+
+from typing import Any
+
+import numpy as np
+
+
+DTYPES = ("float32", "float16", "int8")
+METHODS = ("pca", "truncate")
+
+# Rows decoded per block when scoring int8/float16 codes
+BLOCK_ROWS = 8192
+
+
+class VectorCompressor:
+    """
+    Reduce and quantize unit vectors.
+
+    Usage:
+        compressor = VectorCompressor(dtype="int8", dimension=256).fit(vectors)
+        codes, scales = compressor.encode(vectors)
+        scores = compressor.scores(codes, scales, compressor.project(query))
+    """
+
+    def __init__(
+        self,
+        dtype: str = "int8",
+        dimension: int | None = None,
+        method: str = "pca",
+        sample_size: int = 20000,
+        seed: int = 0,
+    ):
+        """Initialize compressor.
+
+        Args:
+            dtype: Storage type: "float32", "float16" or "int8".
+            dimension: Target dimension (None keeps the input dimension).
+            method: "pca" (uncentered, fit on a sample) or "truncate".
+            sample_size: Rows used to fit PCA.
+            seed: Sampling seed.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown compression dtype: {dtype}")
+        if method not in METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        self.dtype = dtype
+        self.dimension = dimension
+        self.method = method
+        self.sample_size = sample_size
+        self.seed = seed
+        self._components: np.ndarray | None = None  # (input_dim, dimension)
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "VectorCompressor":
+        """Create from a `compression` config dict (extra keys are ignored)."""
+        return cls(
+            dtype=config.get("dtype", "int8"),
+            dimension=config.get("dimension"),
+            method=config.get("method", "pca"),
+        )
+
+    def fit(self, vectors: np.ndarray) -> "VectorCompressor":
+        """Fit the projection on (a sample of) the vectors."""
+        input_dim = vectors.shape[1]
+        if self.dimension is None or self.dimension >= input_dim or self.method == "truncate":
+            self._components = None
+            return self
+
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.sample_size:
+            vectors = vectors[rng.choice(len(vectors), size=self.sample_size, replace=False)]
+        # Right singular vectors of the uncentered data span the subspace
+        # that best preserves inner products
+        _, _, vt = np.linalg.svd(np.asarray(vectors, dtype=np.float32), full_matrices=False)
+        components = vt[:self.dimension].T
+        if components.shape[1] < self.dimension:
+            # Fewer samples than target dimensions; pad with zeros
+            pad = np.zeros((input_dim, self.dimension - components.shape[1]), dtype=np.float32)
+            components = np.hstack([components, pad])
+        self._components = np.ascontiguousarray(components, dtype=np.float32)
+        return self
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduce dimension (vectors or a single query) as float32."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._components is not None:
+            return vectors @ self._components
+        if self.dimension is not None and self.method == "truncate":
+            return np.ascontiguousarray(vectors[..., :self.dimension])
+        return vectors
+
+    def encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        """Project and quantize vectors. Returns (codes, per-vector scales or None)."""
+        projected = self.project(vectors)
+        if self.dtype == "float32":
+            return projected, None
+        if self.dtype == "float16":
+            return projected.astype(np.float16), None
+
+        scales = np.abs(projected).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(projected / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def scores(
+        self,
+        codes: np.ndarray,
+        scales: np.ndarray | None,
+        query: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Approximate inner products between encoded rows and a projected
+        query, or a (dimension, m) matrix of queries.
+
+        int8/float16 codes are decoded to float32 block by block, so this
+        costs a float32 matmul at the reduced dimension plus the copy.
+        """
+        if codes.dtype == np.float32:
+            return codes @ query
+
+        # Decode in blocks so the float32 temporaries stay small
+        result = np.empty((len(codes),) + query.shape[1:], dtype=np.float32)
+        for start in range(0, len(codes), BLOCK_ROWS):
+            block = codes[start:start + BLOCK_ROWS].astype(np.float32)
+            result[start:start + len(block)] = block @ query
+        if scales is not None:
+            result *= scales.reshape((-1,) + (1,) * (query.ndim - 1))
+        return result
+
+    def nbytes(self, codes: np.ndarray, scales: np.ndarray | None) -> int:
+        """Memory used by encoded vectors."""
+        return codes.nbytes + (scales.nbytes if scales is not None else 0)
@@ -8,9 +8,11 @@ Commands:
     expertise query <domain> <q>  - Test semantic search
     expertise list                - List available domains
     expertise stats <domain>      - Show domain statistics
+    expertise compression-check <domain> - Measure compressed-vector recall
 """
 
 import os
+from contextlib import nullcontext
 from pathlib import Path
 
 import click
@@ -20,7 +22,6 @@ from rich.panel import Panel
 from rich.syntax import Syntax
 
 from .engine import ExpertiseEngine
-from .parser import parse_example
 from .types import ExpertiseConfig
 
 console = Console()
@@ -32,21 +33,34 @@ def get_engine(domains_path: str = "./domains") -> ExpertiseEngine:
     supabase_url = os.environ.get("EXPERTISE_SUPABASE_URL")
     supabase_key = os.environ.get("EXPERTISE_SUPABASE_KEY")
 
-    if supabase_url and supabase_key:
+    if os.environ.get("EXPERTISE_VECTOR_STORE") == "memory":
+        # Keyword search over the example files; no database or API key
+        vector_store = {"type": "memory"}
+    elif supabase_url and supabase_key:
         vector_store = {
             "type": "supabase",
             "url": supabase_url,
             "key": supabase_key,
         }
+        replica_path = os.environ.get("EXPERTISE_SUPABASE_REPLICA")
+        if replica_path:
+            # Search a local mirror of the table, kept in sync incrementally
+            vector_store["replica"] = {"path": replica_path}
     else:
         vector_store = {
             "type": "sqlite",
             "path": "./cache/embeddings.db",
+            # "vector" (default), "hybrid" or "lexical" (no embedding calls)
+            "search_mode": os.environ.get("EXPERTISE_SEARCH_MODE", "vector"),
         }
 
+    # "openai" (default) or "hashing" for offline, deterministic embeddings
+    embedder = {"type": os.environ.get("EXPERTISE_EMBEDDER", "openai")}
+
     config = ExpertiseConfig(
         domains_path=Path(domains_path),
         vector_store=vector_store,
+        embedder=embedder,
     )
 
     return ExpertiseEngine.from_config(config)
@@ -242,9 +256,17 @@ def validate(ctx, domain):
 @main.command()
 @click.argument("domain")
 @click.option("--force", "-f", is_flag=True, help="Re-index all examples")
+@click.option("--concurrency", default=4, help="Embedding requests in flight")
+@click.option("--rpm", type=float, help="Embedding requests per minute limit")
+@click.option("--tpm", type=float, help="Embedding tokens per minute limit")
+@click.option("--bulk", is_flag=True, help="Drop and rebuild secondary indexes around the load (sqlite)")
 @click.pass_context
-def index(ctx, domain, force):
+def index(ctx, domain, force, concurrency, rpm, tpm, bulk):
     """Index domain examples for semantic search."""
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+    from .pipeline import IndexPipeline
+
     engine = get_engine(ctx.obj["domains_path"])
 
     try:
@@ -271,28 +293,52 @@ def index(ctx, domain, force):
         deleted = engine.vector_store.delete_domain(domain)
         console.print(f"[dim]Deleted {deleted} existing examples[/dim]")
 
-    # Parse and index examples
-    examples = []
-    with console.status("Parsing examples..."):
-        for file_path in example_files:
-            try:
-                content = file_path.read_text()
-                example = parse_example(content, file_path.stem)
-                example.domain = domain  # Ensure domain is set
-                if not example.category:
-                    # Get category from parent directory
-                    example.category = file_path.parent.name
-                examples.append(example)
-            except Exception as e:
-                console.print(f"[yellow]Warning: Could not parse {file_path}: {e}[/yellow]")
-
-    console.print(f"Parsed {len(examples)} examples")
-
-    # Index with progress
-    with console.status("Indexing examples (generating embeddings)..."):
-        indexed = engine.vector_store.index(examples)
-
-    console.print(f"[green]Indexed {indexed} examples[/green]")
+    # Parse, embed and write concurrently
+    with Progress(
+        TextColumn("Indexing examples"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("{task.fields[rate]:.1f} examples/s"),
+        TimeElapsedColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task("index", total=len(example_files), rate=0.0)
+
+        def report(pipeline_stats):
+            progress.update(task, completed=pipeline_stats.written, rate=pipeline_stats.rate)
+
+        pipeline = IndexPipeline(
+            engine.vector_store,
+            concurrency=concurrency,
+            requests_per_minute=rpm,
+            tokens_per_minute=tpm,
+            progress_callback=report,
+        )
+        bulk_load = getattr(engine.vector_store, "bulk_load", None)
+        if bulk and bulk_load is None:
+            console.print("[yellow]--bulk is only supported by the sqlite store; ignoring[/yellow]")
+        with bulk_load() if bulk and bulk_load else nullcontext():
+            result = pipeline.run(example_files, domain)
+        progress.update(task, total=result.parsed, completed=result.written)
+
+    for file_path, error in result.errors:
+        console.print(f"[yellow]Warning: Could not parse {file_path}: {error}[/yellow]")
+    for example_id, error in result.write_errors:
+        console.print(f"[red]Could not write {example_id}: {error}[/red]")
+
+    console.print(
+        f"[green]Indexed {result.written} examples[/green] "
+        f"[dim]({result.rate:.1f} examples/s, {result.requests} requests, "
+        f"{result.retries} retries)[/dim]"
+    )
+
+    cache = engine.vector_store.embedding_cache
+    if cache is not None:
+        cache_stats = cache.stats()
+        console.print(
+            f"[dim]Embedding cache: {cache_stats['hits']} hits, "
+            f"{cache_stats['misses']} misses[/dim]"
+        )
 
     # Show indexed count
     total = engine.vector_store.count(domain)
@@ -304,8 +350,9 @@ def index(ctx, domain, force):
 @click.argument("query")
 @click.option("--limit", "-n", default=5, help="Number of results")
 @click.option("--category", "-c", help="Filter by category")
+@click.option("--tag", "-t", "tags", multiple=True, help="Filter by tag (repeatable, any match)")
 @click.pass_context
-def query(ctx, domain, query, limit, category):
+def query(ctx, domain, query, limit, category, tags):
     """Search for relevant examples."""
     engine = get_engine(ctx.obj["domains_path"])
 
@@ -314,6 +361,7 @@ def query(ctx, domain, query, limit, category):
         query=query,
         category=category,
         limit=limit,
+        tags=list(tags) or None,
     )
 
     if not examples:
@@ -394,6 +442,49 @@ def stats(ctx, domain):
     console.print(f"\n[bold]Indexed examples:[/bold] {indexed}")
 
 
+@main.command("compression-check")
+@click.argument("domain")
+@click.option("--dtype", type=click.Choice(["float32", "float16", "int8"]), default="int8")
+@click.option("--dimension", type=int, help="Reduce vectors to this many dimensions")
+@click.option("--method", type=click.Choice(["pca", "truncate"]), default="pca")
+@click.option("--rescore", default=10, help="Candidates rescored per result")
+@click.option("--queries", default=100, help="Number of sample queries")
+@click.option("-k", default=5, help="Recall cutoff")
+@click.pass_context
+def compression_check(ctx, domain, dtype, dimension, method, rescore, queries, k):
+    """Measure recall and memory of compressed vectors for a domain."""
+    from .adapters.sqlite import SQLiteAdapter
+
+    engine = get_engine(ctx.obj["domains_path"])
+    if not isinstance(engine.vector_store, SQLiteAdapter):
+        console.print("[red]Error: compression applies to the local SQLite store only[/red]")
+        raise SystemExit(1)
+
+    try:
+        report = engine.vector_store.compression_report(
+            domain,
+            compression={"dtype": dtype, "dimension": dimension, "method": method, "rescore": rescore},
+            queries=queries,
+            k=k,
+        )
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise SystemExit(1)
+
+    table = Table(title=f"Compression: {dtype}, dim={dimension or 'full'}, {method}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Examples", str(report["examples"]))
+    table.add_row(f"Recall@{report['k']} (rescored)", f"{report['recall_at_k']:.3f}")
+    table.add_row(f"Recall@{report['k']} (no rescore)", f"{report['recall_at_k_no_rescore']:.3f}")
+    table.add_row("Memory", f"{report['compressed_bytes']:,} / {report['full_bytes']:,} bytes")
+    table.add_row("Compression ratio", f"{report['compression_ratio']:.1f}x")
+    console.print(table)
+
+    if report["recall_at_k"] < 0.99:
+        console.print("[yellow]Recall loss exceeds 1% - raise --rescore or --dimension[/yellow]")
+
+
 @main.command()
 @click.argument("domain")
 @click.argument("task")
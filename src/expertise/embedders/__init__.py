@@ -0,0 +1,13 @@
+"""
+Embedding providers for domain expertise.
+
+Available embedders:
+- OpenAIEmbedder: OpenAI embeddings API (default)
+- HashingEmbedder: Offline, deterministic feature-hashing projection
+"""
+
+from .base import Embedder
+from .openai import OpenAIEmbedder
+from .hashing import HashingEmbedder
+
+__all__ = ["Embedder", "OpenAIEmbedder", "HashingEmbedder"]
@@ -0,0 +1,81 @@
+"""
+Base embedder interface.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator
+
+
+def batch_texts(
+    texts: list[str],
+    max_items: int,
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> Iterator[list[int]]:
+    """
+    Group texts into batches bounded by item count and total tokens.
+
+    Yields lists of indices into `texts`. A single text larger than
+    `max_tokens` is sent on its own rather than dropped.
+    """
+    batch: list[int] = []
+    batch_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(i)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+class Embedder(ABC):
+    """Abstract base class for text embedding providers."""
+
+    # Identifies the vector space; used in embedding cache keys
+    model: str = ""
+    dimension: int | None = None
+
+    # Request sizing used by batches()
+    batch_size: int = 256
+    batch_tokens: int = 100_000
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed a batch of texts in a single provider request.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text, in input order
+        """
+        pass
+
+    @property
+    def retryable_errors(self) -> tuple[type[BaseException], ...]:
+        """Exceptions that indicate a transient failure worth retrying."""
+        return ()
+
+    def embed_one(self, text: str) -> list[float]:
+        """Embed a single text."""
+        return self.embed([text])[0]
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate tokens in text (roughly four characters per token)."""
+        return len(text) // 4 + 1
+
+    def batches(self, texts: list[str]) -> Iterator[list[int]]:
+        """Split texts into request-sized batches of indices."""
+        return batch_texts(
+            texts,
+            max_items=self.batch_size,
+            max_tokens=self.batch_tokens,
+            count_tokens=self.count_tokens,
+        )
@@ -0,0 +1,79 @@
+"""
+Dependency-free local embedder using the hashing trick.
+
+Projects word unigrams and bigrams into a fixed number of dimensions with
+a signed hash, weights them by log term frequency and L2-normalizes the
+result. Runs offline and is fully deterministic across processes.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from .base import Embedder
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _hash_feature(feature: str, dimension: int) -> tuple[int, float]:
+    """Map a feature to a (bucket, sign) pair."""
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dimension, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbedder(Embedder):
+    """Embed text locally with a signed feature-hashing projection."""
+
+    def __init__(self, dimension: int = 1536, ngram_range: tuple[int, int] = (1, 2)):
+        """Initialize hashing embedder.
+
+        Args:
+            dimension: Output vector size. Keep 1536 to stay compatible
+                with the Supabase vector(1536) column.
+            ngram_range: Smallest and largest word n-gram to hash.
+        """
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.model = f"hashing-{dimension}-{ngram_range[0]}-{ngram_range[1]}"
+        # No provider limits; batches only bound memory
+        self.batch_size = 1024
+        self.batch_tokens = 10_000_000
+
+    def _features(self, text: str) -> Counter:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features: Counter = Counter()
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                features[" ".join(tokens[i:i + n])] += 1
+        return features
+
+    def embed_vector(self, text: str) -> np.ndarray:
+        """Embed text as a float32 NumPy vector."""
+        features = self._features(text)
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        if not features:
+            return vector
+
+        buckets = np.empty(len(features), dtype=np.int64)
+        weights = np.empty(len(features), dtype=np.float32)
+        for i, (feature, count) in enumerate(features.items()):
+            bucket, sign = _hash_feature(feature, self.dimension)
+            buckets[i] = bucket
+            weights[i] = sign * (1.0 + np.log(count))
+
+        np.add.at(vector, buckets, weights)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts locally."""
+        return [self.embed_vector(text).tolist() for text in texts]
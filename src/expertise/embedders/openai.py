@@ -0,0 +1,104 @@
+"""
+OpenAI embeddings API embedder.
+"""
+
+from typing import Any
+
+from .base import Embedder
+
+
+# Error codes and message fragments OpenAI uses for oversized requests
+TOO_LARGE_CODES = frozenset({"context_length_exceeded", "max_tokens_per_request"})
+TOO_LARGE_MESSAGES = (
+    "maximum context length",
+    "max_tokens_per_request",
+    "too many tokens",
+    "too large",
+)
+
+
+def is_too_large(error: Exception) -> bool:
+    """Whether a bad-request error means the batch was too big, not invalid."""
+    if getattr(error, "code", None) in TOO_LARGE_CODES:
+        return True
+    message = str(getattr(error, "message", None) or error).lower()
+    return any(fragment in message for fragment in TOO_LARGE_MESSAGES)
+
+
+class OpenAIEmbedder(Embedder):
+    """Embed text with the OpenAI embeddings API."""
+
+    def __init__(
+        self,
+        model: str = "text-embedding-ada-002",
+        batch_size: int = 256,
+        batch_tokens: int = 100_000,
+        api_key: str | None = None,
+    ):
+        """Initialize OpenAI embedder.
+
+        Args:
+            model: Embedding model name.
+            batch_size: Maximum texts per request.
+            batch_tokens: Maximum total tokens per request.
+            api_key: OpenAI API key. Defaults to OPENAI_API_KEY env var.
+        """
+        self.model = model
+        self.dimension = 1536 if model == "text-embedding-ada-002" else None
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.api_key = api_key
+        self._client: Any = None
+        self._encoder = None
+
+    @property
+    def client(self) -> Any:
+        """Lazily created OpenAI client."""
+        if self._client is None:
+            import openai
+
+            self._client = openai.OpenAI(api_key=self.api_key)
+        return self._client
+
+    @property
+    def retryable_errors(self) -> tuple[type[BaseException], ...]:
+        """Rate limits, timeouts and server errors."""
+        import openai
+
+        return (
+            openai.RateLimitError,
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+        )
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed texts in one request.
+
+        If the provider rejects the request as too large, the batch is
+        split in half and retried; any other bad request is raised as is.
+        """
+        import openai
+
+        try:
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=texts,
+            )
+        except openai.BadRequestError as e:
+            if len(texts) <= 1 or not is_too_large(e):
+                raise
+            middle = len(texts) // 2
+            return self.embed(texts[:middle]) + self.embed(texts[middle:])
+
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in ordered]
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the cl100k_base encoding used by OpenAI embeddings."""
+        if self._encoder is None:
+            import tiktoken
+
+            self._encoder = tiktoken.get_encoding("cl100k_base")
+        return len(self._encoder.encode(text, disallowed_special=()))
@@ -8,6 +8,9 @@ Provides tiered retrieval:
 - Tier 4: On-demand frameworks
 """
 
+import heapq
+from dataclasses import replace
+from itertools import islice
 from pathlib import Path
 from typing import Any
 import yaml
@@ -18,13 +21,23 @@ from .types import (
     Principle,
     Rubric,
     ContrastExample,
+    SearchRequest,
     AnalysisContext,
     ExpertiseConfig,
 )
 from .adapters.base import VectorStoreAdapter
 from .adapters.supabase import SupabaseAdapter
 from .adapters.sqlite import SQLiteAdapter
-from .parser import parse_principles, parse_rubric, parse_example
+from .adapters.replica import ReplicaAdapter
+from .adapters.memory import MemoryAdapter
+from .adapters.cache import EmbeddingCache
+from .embedders import Embedder, OpenAIEmbedder, HashingEmbedder
+from .parser import parse_principles, parse_rubric, parse_example_file
+from .rerank import mmr_rerank
+
+
+# Candidates fetched per example kept when reranking for diversity
+MMR_FETCH_FACTOR = 4
 
 
 class ExpertiseEngine:
@@ -45,12 +58,15 @@ class ExpertiseEngine:
         domains_path: Path,
         vector_store: VectorStoreAdapter,
         domains_enabled: list[str] | None = None,
+        mmr_lambda: float | None = None,
     ):
         self.domains_path = Path(domains_path)
         self.vector_store = vector_store
         self.domains_enabled = domains_enabled
+        self.mmr_lambda = mmr_lambda
         self._domains: dict[str, Domain] = {}
-        self._encoder = tiktoken.get_encoding("cl100k_base")
+        # Loaded on first use: fetching the encoding may need the network
+        self._encoder: tiktoken.Encoding | None = None
 
     @classmethod
     def from_config(cls, config: ExpertiseConfig | dict) -> "ExpertiseEngine":
@@ -58,19 +74,105 @@ class ExpertiseEngine:
         if isinstance(config, dict):
             config = ExpertiseConfig(**config)
 
+        # Create embedder
+        embedder_config = config.embedder
+        embedder_type = embedder_config.get("type", "openai")
+
+        embedder: Embedder
+        if embedder_type == "openai":
+            embedder = OpenAIEmbedder(
+                model=embedder_config.get("model", "text-embedding-ada-002"),
+                batch_size=embedder_config.get("batch_size", 256),
+                batch_tokens=embedder_config.get("batch_tokens", 100_000),
+            )
+        elif embedder_type == "hashing" or embedder_type == "local":
+            embedder = HashingEmbedder(
+                dimension=embedder_config.get("dimension", 1536),
+            )
+        else:
+            raise ValueError(f"Unknown embedder type: {embedder_type}")
+
         # Create vector store adapter
         store_config = config.vector_store
         store_type = store_config.get("type", "sqlite")
 
+        if store_type == "memory" or store_type == "bm25":
+            # Keyword search over example files; no caches, DB or embeddings
+            return cls(
+                domains_path=config.domains_path,
+                vector_store=MemoryAdapter(
+                    embedder=embedder,
+                    k1=store_config.get("k1", 1.2),
+                    b=store_config.get("b", 0.75),
+                ),
+                domains_enabled=config.domains_enabled,
+                mmr_lambda=config.mmr_lambda,
+            )
+
+        # Embedding cache shared by all adapter types (None disables the disk tier)
+        embedding_cache = EmbeddingCache(
+            path=store_config.get("embedding_cache_path", "./cache/embedding_cache.db"),
+            maxsize=store_config.get("embedding_cache_size", 10000),
+        )
+
+        # Query embeddings: small, short-lived, memory only unless a path is set
+        query_cache = EmbeddingCache(
+            path=store_config.get("query_cache_path"),
+            maxsize=store_config.get("query_cache_size", 1024),
+            ttl=store_config.get("query_cache_ttl", 3600),
+        )
+
         if store_type == "supabase":
             vector_store = SupabaseAdapter(
                 url=store_config["url"],
                 key=store_config["key"],
                 table=store_config.get("table", "domain_examples"),
+                embedder=embedder,
+                embedding_cache=embedding_cache,
+                query_cache=query_cache,
+                chunk_rows=store_config.get("chunk_rows", 500),
+                chunk_bytes=store_config.get("chunk_bytes", 4 * 1024 * 1024),
+                max_retries=store_config.get("max_retries", 4),
+                min_similarity=store_config.get("min_similarity"),
+                hnsw_ef_search=store_config.get("hnsw_ef_search"),
+                ivfflat_probes=store_config.get("ivfflat_probes"),
+                count_cache_ttl=store_config.get("count_cache_ttl", 30.0),
+                estimated_counts=store_config.get("estimated_counts", False),
             )
+            replica = store_config.get("replica")
+            if replica:
+                # Serve searches from a local mirror; writes still go to Supabase
+                vector_store = ReplicaAdapter(
+                    source=vector_store,
+                    local=SQLiteAdapter(
+                        path=Path(replica.get("path", "./cache/replica.db")),
+                        embedder=embedder,
+                        embedding_cache=embedding_cache,
+                        query_cache=query_cache,
+                        ann=replica.get("ann"),
+                        payload_compression=replica.get("payload_compression"),
+                    ),
+                    refresh_interval=replica.get("refresh_interval", 30.0),
+                    max_staleness=replica.get("max_staleness", 300.0),
+                    page_size=replica.get("page_size", 1000),
+                )
         elif store_type == "sqlite" or store_type == "file":
             vector_store = SQLiteAdapter(
-                path=Path(store_config.get("path", "./cache/embeddings.db"))
+                path=Path(store_config.get("path", "./cache/embeddings.db")),
+                embedder=embedder,
+                embedding_cache=embedding_cache,
+                query_cache=query_cache,
+                ann=store_config.get("ann"),
+                mmap=store_config.get("mmap", False),
+                mmap_chunk_rows=store_config.get("mmap_chunk_rows", 65536),
+                compression=store_config.get("compression"),
+                example_cache_size=store_config.get("example_cache_size", 4096),
+                search_mode=store_config.get("search_mode", "vector"),
+                search_workers=store_config.get("search_workers"),
+                busy_timeout=store_config.get("busy_timeout", 30.0),
+                db_mmap_size=store_config.get("db_mmap_size", 256 * 1024 * 1024),
+                db_cache_size=store_config.get("db_cache_size", 65536),
+                payload_compression=store_config.get("payload_compression"),
             )
         else:
             raise ValueError(f"Unknown vector store type: {store_type}")
@@ -79,6 +181,7 @@ class ExpertiseEngine:
             domains_path=config.domains_path,
             vector_store=vector_store,
             domains_enabled=config.domains_enabled,
+            mmr_lambda=config.mmr_lambda,
         )
 
     def load_domain(self, domain_name: str) -> Domain:
@@ -104,6 +207,16 @@ class ExpertiseEngine:
                 rubric = parse_rubric(rubric_file.read_text(), rubric_file.stem)
                 domain.rubrics.append(rubric)
 
+        # Load examples when they are searched in memory rather than in a
+        # pre-built vector store
+        if isinstance(self.vector_store, MemoryAdapter) and domain.examples_path.exists():
+            for example_file in sorted(domain.examples_path.rglob("*.md")):
+                if example_file.name.startswith("_"):
+                    continue  # templates
+                domain.examples.append(parse_example_file(example_file, domain_name))
+            self.vector_store.delete_domain(domain_name)
+            self.vector_store.index(domain.examples)
+
         self._domains[domain_name] = domain
         return domain
 
@@ -138,15 +251,68 @@ class ExpertiseEngine:
         query: str,
         category: str | None = None,
         limit: int = 5,
+        tags: list[str] | None = None,
     ) -> list[ContrastExample]:
         """Retrieve relevant contrast examples via semantic search (Tier 3)."""
+        if isinstance(self.vector_store, MemoryAdapter):
+            self.load_domain(domain_name)
         return self.vector_store.search(
             query=query,
             domain=domain_name,
             category=category,
             limit=limit,
+            tags=tags,
         )
 
+    def get_examples_many(
+        self,
+        requests: list[SearchRequest],
+    ) -> list[list[ContrastExample]]:
+        """
+        Retrieve examples for several queries at once (Tier 3).
+
+        All queries are embedded in one batch; results are returned in
+        request order.
+        """
+        if isinstance(self.vector_store, MemoryAdapter):
+            for domain_name in {request.domain for request in requests if request.domain}:
+                self.load_domain(domain_name)
+        return self.vector_store.search_many(requests)
+
+    def search_all_domains(
+        self,
+        query: str,
+        category: str | None = None,
+        limit: int = 5,
+        tags: list[str] | None = None,
+    ) -> list[ContrastExample]:
+        """
+        Retrieve the best examples across every enabled domain (Tier 3).
+
+        With all domains enabled this is a single store-wide search, which
+        the store may split across partitions. Otherwise each enabled
+        domain is searched (one embedding batch for all of them) and the
+        per-domain rankings are k-way merged.
+        """
+        if self.domains_enabled is None and not isinstance(self.vector_store, MemoryAdapter):
+            return self.vector_store.search(
+                query=query,
+                category=category,
+                limit=limit,
+                tags=tags,
+            )
+
+        domains = self.list_domains()
+        results = self.get_examples_many([
+            SearchRequest(query, domain_name, category, limit, tags) for domain_name in domains
+        ])
+        merged = heapq.merge(
+            *results,
+            key=lambda example: example.similarity or 0.0,
+            reverse=True,
+        )
+        return list(islice(merged, limit))
+
     def get_framework(self, domain_name: str, framework_id: str) -> str | None:
         """Get deep reference framework on-demand (Tier 4)."""
         domain = self.load_domain(domain_name)
@@ -164,11 +330,16 @@ class ExpertiseEngine:
         task: str,
         query: str,
         token_budget: int = 8000,
+        mmr_lambda: float | None = None,
     ) -> AnalysisContext:
         """
         Prepare complete context for an analysis task.
 
         Orchestrates retrieval from all tiers with token budget management.
+        With `mmr_lambda` (or the engine default) set, more candidates are
+        retrieved and reranked with maximal marginal relevance so the
+        example budget isn't spent on near-duplicates; 1.0 keeps the
+        relevance order, lower values favor diversity.
         """
         used_tokens = 0
 
@@ -189,7 +360,23 @@ class ExpertiseEngine:
         avg_example_tokens = 600
 
         max_examples = max(1, examples_budget // avg_example_tokens)
-        examples = self.get_examples(domain_name, query, limit=max_examples)
+        if mmr_lambda is None:
+            mmr_lambda = self.mmr_lambda
+        if mmr_lambda is None:
+            examples = self.get_examples(domain_name, query, limit=max_examples)
+        else:
+            if isinstance(self.vector_store, MemoryAdapter):
+                self.load_domain(domain_name)
+            candidates = self.vector_store.search(
+                query=query,
+                domain=domain_name,
+                limit=max_examples * MMR_FETCH_FACTOR,
+                include_embeddings=True,
+            )
+            examples = [
+                replace(example, embedding=None)  # keep vectors out of the context
+                for example in mmr_rerank(candidates, max_examples, mmr_lambda)
+            ]
 
         for ex in examples:
             used_tokens += self._count_tokens(str(ex))
@@ -202,7 +389,12 @@ class ExpertiseEngine:
         )
 
     def _count_tokens(self, text: str) -> int:
-        """Count tokens in text."""
+        """Count tokens in text (approximately if the encoding is unavailable offline)."""
+        if self._encoder is None:
+            try:
+                self._encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                return len(text) // 4 + 1
         return len(self._encoder.encode(text))
 
     def list_domains(self) -> list[str]:
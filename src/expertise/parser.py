@@ -9,6 +9,7 @@ Handles:
 
 import re
 import yaml
+from pathlib import Path
 from typing import Any
 
 from .types import Principle, Rubric, RubricLevel, ContrastExample
@@ -282,3 +283,18 @@ def parse_example(content: str, file_path: str = "") -> ContrastExample:
         teaching_point=teaching_point,
         when_to_apply=when_to_apply,
     )
+
+
+def parse_example_file(file_path: Path, domain: str) -> ContrastExample:
+    """
+    Parse a contrast example file belonging to `domain`.
+
+    The category falls back to the parent directory name when the
+    frontmatter does not set one.
+    """
+    example = parse_example(file_path.read_text(), file_path.stem)
+    example.domain = domain  # Ensure domain is set
+    if not example.category:
+        # Get category from parent directory
+        example.category = file_path.parent.name
+    return example
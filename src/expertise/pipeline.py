@@ -0,0 +1,287 @@
+"""
+Asynchronous bulk indexing pipeline.
+
+Stages are connected by bounded queues so memory stays flat on large
+corpora:
+
+    parse -> embed (N workers) -> write
+
+Embedding requests are throttled by request-per-minute and
+token-per-minute limiters and retried with exponential backoff and full
+jitter on transient provider errors (e.g. 429s).
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from .adapters.base import UpsertError, VectorStoreAdapter
+from .parser import parse_example_file
+from .types import ContrastExample
+
+
+class RateLimiter:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._available = per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until `amount` units are available, then consume them."""
+        # A single request larger than the bucket can never fit; let it
+        # drain the bucket instead of waiting forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._available = min(
+                    self.capacity,
+                    self._available + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+                await asyncio.sleep((amount - self._available) / self.rate)
+
+
+@dataclass
+class PipelineStats:
+    """Progress counters for an indexing run."""
+    total: int = 0
+    parsed: int = 0
+    embedded: int = 0
+    written: int = 0
+    cache_hits: int = 0
+    requests: int = 0
+    retries: int = 0
+    errors: list[tuple[str, str]] = field(default_factory=list)
+    write_errors: list[tuple[str, str]] = field(default_factory=list)  # (example id, error)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Examples written per second."""
+        elapsed = self.elapsed
+        return self.written / elapsed if elapsed > 0 else 0.0
+
+
+class IndexPipeline:
+    """
+    Concurrent parse -> embed -> write indexing for a vector store.
+
+    Usage:
+        pipeline = IndexPipeline(store, concurrency=8, requests_per_minute=3000)
+        stats = pipeline.run(example_files, domain="copywriting")
+    """
+
+    def __init__(
+        self,
+        store: VectorStoreAdapter,
+        concurrency: int = 4,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        queue_size: int = 8,
+        write_batch_size: int = 4096,
+        progress_callback: Callable[[PipelineStats], None] | None = None,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            store: Vector store that receives the examples.
+            concurrency: Number of embedding requests in flight.
+            requests_per_minute: Embedding request limit (None = unlimited).
+            tokens_per_minute: Embedding token limit (None = unlimited).
+            max_retries: Retries per batch on transient errors.
+            base_delay: First backoff delay in seconds.
+            max_delay: Upper bound on a single backoff delay.
+            queue_size: Batches buffered between stages.
+            write_batch_size: Most examples per store write; embedded
+                batches already waiting are merged up to this size.
+            progress_callback: Called with stats after each written batch.
+        """
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.write_batch_size = write_batch_size
+        self.progress_callback = progress_callback
+        self._request_limiter: RateLimiter | None = None
+        self._token_limiter: RateLimiter | None = None
+
+    def run(self, files: list[Path], domain: str) -> PipelineStats:
+        """Index example files synchronously."""
+        return asyncio.run(self.arun(files, domain))
+
+    async def arun(self, files: list[Path], domain: str) -> PipelineStats:
+        """Index example files."""
+        # Limiters hold an asyncio.Lock, so create them inside the running loop
+        if self.requests_per_minute:
+            self._request_limiter = RateLimiter(self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._token_limiter = RateLimiter(self.tokens_per_minute)
+
+        stats = PipelineStats(total=len(files))
+        embed_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._parse(files, domain, embed_queue, stats))
+            for _ in range(self.concurrency):
+                group.create_task(self._embed(embed_queue, write_queue, stats))
+            group.create_task(self._write(write_queue, stats))
+
+        return stats
+
+    async def _parse(
+        self,
+        files: list[Path],
+        domain: str,
+        embed_queue: asyncio.Queue,
+        stats: PipelineStats,
+    ) -> None:
+        """Parse files into request-sized batches of examples."""
+        embedder = self.store.embedder
+        batch: list[ContrastExample] = []
+        batch_tokens = 0
+
+        for file_path in files:
+            try:
+                example = parse_example_file(file_path, domain)
+            except Exception as e:
+                stats.errors.append((str(file_path), str(e)))
+                continue
+            stats.parsed += 1
+
+            tokens = embedder.count_tokens(self.store.example_to_text(example))
+            if batch and (
+                len(batch) >= embedder.batch_size
+                or batch_tokens + tokens > embedder.batch_tokens
+            ):
+                await embed_queue.put(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(example)
+            batch_tokens += tokens
+
+        if batch:
+            await embed_queue.put(batch)
+        for _ in range(self.concurrency):
+            await embed_queue.put(None)
+
+    async def _embed(
+        self,
+        embed_queue: asyncio.Queue,
+        write_queue: asyncio.Queue,
+        stats: PipelineStats,
+    ) -> None:
+        """Embed batches, reusing cached vectors and respecting rate limits."""
+        store = self.store
+        cache = store.embedding_cache
+
+        while (batch := await embed_queue.get()) is not None:
+            texts = [store.example_to_text(example) for example in batch]
+            if cache is not None:
+                # The disk tier is SQLite; keep its I/O off the event loop
+                embeddings = await asyncio.to_thread(
+                    cache.get_many, store.embedding_model, texts,
+                )
+            else:
+                embeddings = [None] * len(texts)
+
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            stats.cache_hits += len(texts) - len(missing)
+
+            if missing:
+                pending = [texts[i] for i in missing]
+                vectors = await self._request(pending, stats)
+                if cache is not None:
+                    await asyncio.to_thread(
+                        cache.put_many, store.embedding_model, pending, vectors,
+                    )
+                for i, vector in zip(missing, vectors):
+                    embeddings[i] = vector
+
+            stats.embedded += len(batch)
+            await write_queue.put((batch, embeddings))
+
+        await write_queue.put(None)
+
+    async def _request(self, texts: list[str], stats: PipelineStats) -> list[list[float]]:
+        """Call the embedder with rate limiting and exponential backoff."""
+        embedder = self.store.embedder
+        tokens = sum(embedder.count_tokens(text) for text in texts)
+
+        for attempt in range(self.max_retries + 1):
+            if self._request_limiter:
+                await self._request_limiter.acquire(1)
+            if self._token_limiter:
+                await self._token_limiter.acquire(tokens)
+
+            try:
+                stats.requests += 1
+                return await asyncio.to_thread(embedder.embed, texts)
+            except embedder.retryable_errors:
+                if attempt == self.max_retries:
+                    raise
+                stats.retries += 1
+                # Full jitter: spread retries so workers don't stampede together
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+                await asyncio.sleep(random.uniform(0, delay))
+
+        raise AssertionError("unreachable")
+
+    async def _write(self, write_queue: asyncio.Queue, stats: PipelineStats) -> None:
+        """
+        Write embedded batches to the store.
+
+        Batches that piled up while the previous write ran are merged into
+        one upsert, so the store commits fewer, larger transactions.
+        """
+        finished_workers = 0
+        while finished_workers < self.concurrency:
+            item = await write_queue.get()
+            if item is None:
+                finished_workers += 1
+                continue
+
+            examples, embeddings = list(item[0]), list(item[1])
+            while len(examples) < self.write_batch_size and not write_queue.empty():
+                item = write_queue.get_nowait()
+                if item is None:
+                    finished_workers += 1
+                    continue
+                examples.extend(item[0])
+                embeddings.extend(item[1])
+
+            try:
+                stats.written += await asyncio.to_thread(self.store.upsert, examples, embeddings)
+            except UpsertError as e:
+                stats.written += e.written
+                stats.write_errors.extend(e.failures)
+            if self.progress_callback:
+                self.progress_callback(stats)
+
+        # Stores that defer persisting derived indexes (SQLite ANN files)
+        # write them once, at the end of the load
+        flush = getattr(self.store, "flush", None)
+        if flush is not None:
+            await asyncio.to_thread(flush)
@@ -0,0 +1,119 @@
+"""
+Diversity reranking for retrieved examples.
+
+Maximal marginal relevance (Carbonell & Goldstein, 1998) picks each next
+example by trading its relevance against its similarity to examples
+already picked, so near-duplicate contrast examples don't crowd out
+distinct teaching points.
+"""
+
+import re
+
+import numpy as np
+
+from .types import ContrastExample
+
+
+def mmr_select(
+    relevance: np.ndarray,
+    similarity: np.ndarray,
+    k: int,
+    lambda_: float = 0.7,
+) -> list[int]:
+    """
+    Greedy MMR selection.
+
+    Args:
+        relevance: (n,) relevance of each candidate to the query
+        similarity: (n, n) pairwise candidate similarity
+        k: Number of candidates to select
+        lambda_: 1.0 ranks by relevance only; lower values favor diversity
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    n = len(relevance)
+    k = min(k, n)
+    selected: list[int] = []
+    if k <= 0:
+        return selected
+
+    # Highest similarity of each candidate to anything selected so far
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    for _ in range(k):
+        scores = lambda_ * relevance - (1.0 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[:, best])
+    return selected
+
+
+def _embedding_similarity(examples: list[ContrastExample]) -> np.ndarray:
+    """Pairwise cosine similarity of example embeddings."""
+    matrix = np.array([example.embedding for example in examples], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix @ matrix.T
+
+
+def _token_similarity(examples: list[ContrastExample]) -> np.ndarray:
+    """Pairwise Jaccard similarity of example word sets."""
+    token_sets = [
+        set(re.findall(
+            r"\w+",
+            f"{ex.weak_content} {ex.strong_content} {ex.teaching_point}".lower(),
+        ))
+        for ex in examples
+    ]
+    vocabulary = {token: i for i, token in enumerate(set().union(*token_sets))}
+    incidence = np.zeros((len(examples), len(vocabulary)), dtype=np.float32)
+    for row, tokens in enumerate(token_sets):
+        incidence[row, [vocabulary[token] for token in tokens]] = 1.0
+
+    intersection = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    union[union == 0] = 1.0
+    return intersection / union
+
+
+def mmr_rerank(
+    examples: list[ContrastExample],
+    k: int,
+    lambda_: float = 0.7,
+) -> list[ContrastExample]:
+    """
+    Rerank search results for diversity.
+
+    Relevance is each example's `similarity` divided by the best one, so
+    cosine, BM25 and fused scores all work on the same scale. Redundancy
+    is embedding cosine similarity when every example carries an
+    embedding, and word-set overlap otherwise.
+
+    Args:
+        examples: Candidates, typically several times more than `k`
+        k: Number of examples to keep
+        lambda_: 1.0 keeps the original ranking; lower values favor diversity
+
+    Returns:
+        Up to `k` examples in selection order
+    """
+    if len(examples) <= 1:
+        return examples[:k]
+
+    relevance = np.array(
+        [example.similarity or 0.0 for example in examples], dtype=np.float32,
+    )
+    top = relevance.max()
+    relevance = relevance / top if top > 0 else np.ones_like(relevance)
+
+    if all(example.embedding is not None for example in examples):
+        similarity = _embedding_similarity(examples)
+    else:
+        similarity = _token_similarity(examples)
+
+    return [examples[i] for i in mmr_select(relevance, similarity, k, lambda_)]
@@ -57,6 +57,16 @@ class ContrastExample:
     similarity: float | None = None
 
 
+@dataclass
+class SearchRequest:
+    """One query in a batched example search."""
+    query: str
+    domain: str | None = None
+    category: str | None = None
+    limit: int = 5
+    tags: list[str] | None = None  # match examples with any of these tags
+
+
 @dataclass
 class Domain:
     """A complete domain with all its knowledge."""
@@ -104,3 +114,5 @@ class ExpertiseConfig:
     domains_path: Path
     vector_store: dict[str, Any]
     domains_enabled: list[str] | None = None  # None = all domains
+    embedder: dict[str, Any] = field(default_factory=lambda: {"type": "openai"})
+    mmr_lambda: float | None = None  # diversity rerank of examples; None = off
@@ -0,0 +1,106 @@
+-- Versioned search function and HNSW vector index
+--
+-- 001 and the adapter's built-in schema (SUPABASE_SCHEMA) defined
+-- search_domain_examples with different parameter names. This migration
+-- replaces both with search_domain_examples_v2, which the adapter calls,
+-- and keeps search_domain_examples as a thin wrapper for older clients.
+
+-- Drop both earlier signatures so no ambiguous overloads remain
+DROP FUNCTION IF EXISTS search_domain_examples(vector, text, text, text[], int, float);
+DROP FUNCTION IF EXISTS search_domain_examples(vector, int, text, text, text[]);
+DROP FUNCTION IF EXISTS search_domain_examples(vector, int, text, text);
+
+-- All filters run inside Postgres. Index search parameters are set for
+-- the current transaction only, so each request can trade recall for
+-- latency without touching server settings.
+CREATE OR REPLACE FUNCTION search_domain_examples_v2(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    filter_domain TEXT DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    filter_tags TEXT[] DEFAULT NULL,
+    min_similarity FLOAT DEFAULT NULL,
+    ivfflat_probes INT DEFAULT NULL,
+    hnsw_ef_search INT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    domain TEXT,
+    category TEXT,
+    example_id TEXT,
+    tags TEXT[],
+    content JSONB,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF ivfflat_probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', ivfflat_probes::text, true);
+    END IF;
+    IF hnsw_ef_search IS NOT NULL THEN
+        PERFORM set_config('hnsw.ef_search', hnsw_ef_search::text, true);
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        de.id,
+        de.domain,
+        de.category,
+        de.example_id,
+        de.tags,
+        de.content,
+        1 - (de.embedding <=> query_embedding) AS similarity
+    FROM domain_examples de
+    WHERE
+        de.embedding IS NOT NULL
+        AND (filter_domain IS NULL OR de.domain = filter_domain)
+        AND (filter_category IS NULL OR de.category = filter_category)
+        AND (filter_tags IS NULL OR de.tags && filter_tags)
+        -- Written as a distance bound so the ORDER BY can still use the index
+        AND (min_similarity IS NULL OR de.embedding <=> query_embedding <= 1 - min_similarity)
+    ORDER BY de.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- Compatibility wrapper with the parameters older adapters send
+CREATE OR REPLACE FUNCTION search_domain_examples(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    filter_domain TEXT DEFAULT NULL,
+    filter_category TEXT DEFAULT NULL,
+    filter_tags TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    domain TEXT,
+    category TEXT,
+    example_id TEXT,
+    tags TEXT[],
+    content JSONB,
+    similarity FLOAT
+)
+LANGUAGE SQL
+AS $$
+    SELECT * FROM search_domain_examples_v2(
+        query_embedding, match_count, filter_domain, filter_category, filter_tags
+    );
+$$;
+
+-- Vector index: HNSW (pgvector >= 0.5.0) keeps recall steady as the table
+-- grows and needs no retraining, unlike IVFFlat whose fixed lists = 100
+-- degrades past ~100k rows. Tune recall per query with hnsw_ef_search.
+--
+-- To stay on IVFFlat instead, skip this section and rebuild the existing
+-- index with lists of about rows / 1000 (sqrt(rows) past 1M rows), then
+-- tune recall per query with ivfflat_probes (about sqrt(lists)).
+DROP INDEX IF EXISTS idx_domain_examples_embedding;
+DROP INDEX IF EXISTS domain_examples_embedding_idx;
+CREATE INDEX IF NOT EXISTS idx_domain_examples_embedding_hnsw
+ON domain_examples
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+COMMENT ON FUNCTION search_domain_examples_v2 IS 'Filtered semantic search with a similarity floor and per-query index parameters';
+COMMENT ON FUNCTION search_domain_examples(vector, int, text, text, text[]) IS 'Deprecated: wrapper around search_domain_examples_v2';
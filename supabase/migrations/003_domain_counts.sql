@@ -0,0 +1,47 @@
+-- Per-domain example counts in one round trip
+--
+-- Exact counts use the domain index (an index-only scan once the table
+-- is vacuumed). Estimated counts read planner statistics instead: the
+-- table's row estimate times each domain's frequency in pg_stats, which
+-- costs nothing but is only as fresh as the last ANALYZE. Domains too
+-- rare for the statistics' most-common-values list are left out of the
+-- estimate, so a missing domain does not mean it is empty; the adapters
+-- count such domains exactly.
+
+CREATE OR REPLACE FUNCTION domain_example_counts(estimated BOOLEAN DEFAULT false)
+RETURNS TABLE (
+    domain TEXT,
+    count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF estimated THEN
+        RETURN QUERY
+        SELECT
+            mcv.domain,
+            round(mcv.frequency * greatest(c.reltuples, 0))::BIGINT
+        FROM pg_stats s
+        CROSS JOIN LATERAL unnest(
+            s.most_common_vals::text::text[],
+            s.most_common_freqs
+        ) AS mcv(domain, frequency)
+        JOIN pg_class c ON c.oid = 'domain_examples'::regclass
+        WHERE s.schemaname = current_schema()
+            AND s.tablename = 'domain_examples'
+            AND s.attname = 'domain';
+        -- Without statistics at all, fall back to exact counts
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    SELECT de.domain, COUNT(*)::BIGINT
+    FROM domain_examples de
+    GROUP BY de.domain;
+END;
+$$;
+
+COMMENT ON FUNCTION domain_example_counts IS 'Example count per domain, exact or from planner statistics';
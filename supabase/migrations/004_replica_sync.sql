@@ -0,0 +1,8 @@
+-- Delta sync for local read replicas
+--
+-- Replicas page through rows changed since their last sync in
+-- (updated_at, id) order; this index makes each page a range scan.
+-- updated_at itself is maintained by the trigger from 001.
+
+CREATE INDEX IF NOT EXISTS idx_domain_examples_updated
+ON domain_examples(updated_at, id);
@@ -0,0 +1,11 @@
+-- Backfill the tags column from content
+--
+-- Earlier clients only stored tags inside content->'tags', leaving the
+-- column at '{}'. search_domain_examples_v2 filters on the column
+-- (de.tags && filter_tags), so those rows never matched a tag filter
+-- until they were re-indexed. Touched rows get a new updated_at and are
+-- pulled once more by local read replicas.
+
+UPDATE domain_examples
+SET tags = ARRAY(SELECT jsonb_array_elements_text(content->'tags'))
+WHERE tags = '{}' AND content ? 'tags';
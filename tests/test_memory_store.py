@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from expertise.engine import ExpertiseEngine
+from expertise.types import ExpertiseConfig
+
+
+DOMAINS_PATH = Path(__file__).resolve().parents[1] / "domains"
+
+
+@pytest.fixture
+def engine():
+    return ExpertiseEngine.from_config(ExpertiseConfig(
+        domains_path=DOMAINS_PATH,
+        vector_store={"type": "memory"},
+        embedder={"type": "hashing"},
+    ))
+
+
+def test_get_examples_ranks_domain_examples(engine):
+    examples = engine.get_examples("copywriting", "B2B SaaS headline", limit=3)
+
+    assert examples
+    assert all(example.domain == "copywriting" for example in examples)
+    assert "SaaS" in examples[0].tags
+    similarities = [example.similarity for example in examples]
+    assert similarities == sorted(similarities, reverse=True)
+    assert similarities[0] == pytest.approx(1.0)
+    assert all(0.0 < similarity <= 1.0 for similarity in similarities)
+
+
+def test_get_examples_filters_by_category(engine):
+    examples = engine.get_examples("copywriting", "headline", category="headlines")
+
+    assert examples
+    assert all(example.category == "headlines" for example in examples)
+    assert engine.get_examples("copywriting", "headline", category="missing") == []
+
+
+def test_search_all_domains_merges_scaled_scores(engine):
+    examples = engine.search_all_domains("headline", limit=10)
+
+    assert len({example.domain for example in examples}) > 1
+    similarities = [example.similarity for example in examples]
+    assert similarities == sorted(similarities, reverse=True)
+    assert all(0.0 < similarity <= 1.0 for similarity in similarities)